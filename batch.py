@@ -0,0 +1,140 @@
+import argparse
+import csv
+import json
+import os
+import time
+
+import pennywise
+from journal import SYNC_MODES
+from money import parse_amount
+from storage import SQLiteStorage
+
+
+def read_rows(path, file_format=None):
+    """Yield (line number, row dict) for every row of a CSV or JSON Lines file."""
+    if file_format is None:
+        file_format = "jsonl" if path.endswith((".jsonl", ".json")) else "csv"
+    with open(path, "r", newline="") as f:
+        if file_format == "jsonl":
+            for line_number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    yield line_number, json.loads(line)
+                except json.JSONDecodeError:
+                    yield line_number, None
+        else:
+            # Line 1 is the header
+            for line_number, row in enumerate(csv.DictReader(f), start=2):
+                yield line_number, row
+
+
+def text_field(row, name, default=""):
+    """Return a field as stripped text, or default if it is missing or null."""
+    value = row.get(name)
+    if value is None:
+        return default
+    if not isinstance(value, str):
+        raise ValueError(f"{name.capitalize()} must be text.")
+    return value.strip()
+
+
+def validate_row(row, default_username=None, check_users=True):
+    """Return a (username, type, amount, category, date) tuple or raise ValueError."""
+    if not isinstance(row, dict):
+        raise ValueError("Row is not a valid record.")
+    username = text_field(row, "username") or (default_username or "").strip()
+    if not username:
+        raise ValueError("Missing username.")
+    if check_users and pennywise.find_user(username) is None:
+        raise ValueError(f"User '{username}' does not exist.")
+
+    transaction_type = text_field(row, "type").lower()
+    if transaction_type not in ["income", "expense"]:
+        raise ValueError("Type must be 'income' or 'expense'.")
+
+    try:
+        amount = parse_amount(row.get("amount"))
+    except (TypeError, ValueError):
+        raise ValueError("Amount must be a number.")
+    if not amount > 0:
+        raise ValueError("Amount must be a positive number.")
+
+    category = text_field(row, "category")
+    if not category:
+        category = "Income" if transaction_type == "income" else "Uncategorized"
+
+    date = text_field(row, "date")
+    try:
+        date = pennywise.parse_date(date)
+    except ValueError:
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+
+    return username, transaction_type, amount, category, date
+
+
+def import_transactions(path, default_username=None, file_format=None, check_users=True):
+    """Validate every row of a file and store the valid ones with a single write.
+
+    Returns a report with the accepted row count, the rejected rows (line and
+    reason) and the throughput.
+    """
+    started = time.perf_counter()
+    accepted = []
+    rejected = []
+    for line_number, row in read_rows(path, file_format):
+        try:
+            accepted.append(validate_row(row, default_username, check_users))
+        except ValueError as e:
+            rejected.append({"line": line_number, "reason": str(e)})
+    pennywise.add_transactions(accepted)
+    seconds = time.perf_counter() - started
+    return {
+        "accepted": len(accepted),
+        "rejected": rejected,
+        "seconds": seconds,
+        "rows_per_second": (len(accepted) + len(rejected)) / seconds if seconds else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Penny Wise commands without the interactive menu.")
+    parser.add_argument("--sqlite", metavar="DB", default=os.environ.get("PENNYWISE_DB"),
+                        help="Use this SQLite database instead of the CSV files")
+    parser.add_argument("--sync", choices=SYNC_MODES, default="none",
+                        help="When to fsync the journal: never, once per write, or after every change")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Import transactions from a CSV or JSON Lines file")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--user", help="Username for rows that do not have one")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"], help="Defaults to the file extension")
+
+    summary_parser = commands.add_parser("summary", help="Print the financial summary of a user")
+    summary_parser.add_argument("username")
+
+    commands.add_parser("compact", help="Fold the transaction journal into transactions.csv")
+    args = parser.parse_args()
+
+    if args.sqlite:
+        pennywise.use_storage(SQLiteStorage(args.sqlite))
+    pennywise.journal.sync = args.sync
+    pennywise.load_budgets()
+    pennywise.load_transactions()
+
+    if args.command == "import":
+        report = import_transactions(args.path, args.user, args.format)
+        for rejected in report["rejected"]:
+            print(f"⚠️  Line {rejected['line']}: {rejected['reason']}")
+        print(f"✅ Imported {report['accepted']} transactions, rejected {len(report['rejected'])} "
+              f"in {report['seconds']:.2f}s ({report['rows_per_second']:.0f} rows/s).")
+    elif args.command == "summary":
+        pennywise.financial_summary(args.username)
+    elif args.command == "compact":
+        pennywise.compact_transactions()
+        print("✅ Journal compacted.")
+    pennywise.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Seeded synthetic data for the benchmarks.
+
+Every function takes a seed, so the same arguments always produce the same
+ledger and results stay comparable across commits.
+"""
+import csv
+import datetime
+import random
+
+SCALES = {"10k": 10000, "1m": 1000000, "10m": 10000000}
+CATEGORIES = ["food", "entertainment", "transport", "salary", "miscellaneous"]
+INTERVALS = ["daily", "weekly", "monthly", "yearly"]
+FIRST_DAY = datetime.date(2020, 1, 1)
+DAYS = 1500
+
+
+def generate_users(count, seed=0):
+    """Return a list of (username, password) pairs."""
+    rng = random.Random(seed)
+    return [(f"user{i}", f"pw{rng.randrange(10 ** 6)}") for i in range(count)]
+
+
+def generate_transactions(rows, users=1000, seed=0):
+    """Yield (username, type, amount, category, date) tuples without building a list."""
+    rng = random.Random(seed)
+    usernames = [f"user{i}" for i in range(users)]
+    dates = [FIRST_DAY + datetime.timedelta(days=day) for day in range(DAYS)]
+    for _ in range(rows):
+        if rng.random() < 0.2:
+            transaction_type, category = "income", "salary"
+        else:
+            transaction_type, category = "expense", rng.choice(CATEGORIES[:3] + CATEGORIES[4:])
+        yield (rng.choice(usernames), transaction_type, round(rng.uniform(1, 5000), 2), category, rng.choice(dates))
+
+
+def generate_budgets(count, users=1000, seed=0):
+    """Return pennywise-style budget goals as dicts."""
+    rng = random.Random(seed)
+    budgets = []
+    for i in range(count):
+        start = FIRST_DAY + datetime.timedelta(days=rng.randrange(DAYS))
+        budgets.append({
+            "goal": f"goal{i}",
+            "progress": round(rng.uniform(0, 10000), 2),
+            "start_date": start,
+            "end_date": start + datetime.timedelta(days=rng.randrange(30, 400)),
+            "username": f"user{rng.randrange(users)}",
+        })
+    return budgets
+
+
+def generate_category_limits(seed=0):
+    """Return a category -> budget limit dict for the BudgetManager variants."""
+    rng = random.Random(seed)
+    return {category: round(rng.uniform(1000, 100000), 2) for category in CATEGORIES}
+
+
+def generate_recurring_rules(count, seed=0, today=None):
+    """Return RecurringTransactionManager rules that fall due within the last 90 days."""
+    rng = random.Random(seed)
+    today = today or datetime.date.today()
+    rules = []
+    for i in range(count):
+        interval = rng.choice(INTERVALS)
+        next_due = today - datetime.timedelta(days=rng.randrange(90))
+        rules.append({
+            "type": rng.choice(["income", "expense"]),
+            "category": f"rule{i}",
+            "amount": round(rng.uniform(1, 5000), 2),
+            "interval": interval,
+            # Day 1-28 so monthly rules never land on a missing day
+            "next_due": next_due.replace(day=min(next_due.day, 28)),
+        })
+    return rules
+
+
+def write_transactions_csv(path, rows, users=1000, seed=0):
+    """Write a pennywise transactions.csv with the given number of rows."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "username", "type", "amount", "category", "date"])
+        writer.writerows((transaction_id, *row) for transaction_id, row in enumerate(
+            generate_transactions(rows, users, seed), start=1))
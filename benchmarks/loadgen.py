@@ -0,0 +1,116 @@
+"""Drive the Penny Wise service with many concurrent clients.
+
+Run from the repository root:
+    python -m benchmarks.loadgen --clients 50 --requests 200
+    python -m benchmarks.loadgen --host 127.0.0.1 --port 8765
+
+Without --port an in-process service is started on an empty ledger in a
+temporary directory. Reports requests per second and latency percentiles.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+
+import pennywise
+from benchmarks import generator
+from journal import TransactionJournal
+
+
+def percentile(latencies, fraction):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def request(reader, writer, latencies, **fields):
+    started = time.perf_counter()
+    writer.write(json.dumps(fields).encode() + b"\n")
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    latencies.append(time.perf_counter() - started)
+    return response
+
+
+async def client(host, port, number, requests, seed, latencies):
+    """One user: register, log in, then a mix of adds, views and summaries."""
+    rng = random.Random(seed + number)
+    username = f"load{number}"
+    reader, writer = await asyncio.open_connection(host, port)
+    await request(reader, writer, latencies, op="register", username=username, password="secret")
+    await request(reader, writer, latencies, op="login", username=username, password="secret")
+    for _ in range(requests):
+        roll = rng.random()
+        if roll < 0.6:
+            await request(reader, writer, latencies, op="add", type=rng.choice(["income", "expense"]),
+                          amount=round(rng.uniform(1, 500), 2), category=rng.choice(generator.CATEGORIES),
+                          date=f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}")
+        elif roll < 0.9:
+            await request(reader, writer, latencies, op="view", limit=20)
+        else:
+            await request(reader, writer, latencies, op="summary")
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run_load(host, port, clients=20, requests=100, seed=0):
+    """Run the clients against host:port and return the throughput and latency report."""
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(host, port, number, requests, seed, latencies) for number in range(clients)))
+    seconds = time.perf_counter() - started
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "seconds": seconds,
+        "requests_per_second": len(latencies) / seconds if seconds else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def run_local(clients, requests, seed):
+    """Start a service on a fresh ledger in a temporary directory and load it."""
+    from service import PennyWiseService
+
+    with tempfile.TemporaryDirectory() as directory:
+        pennywise.users_file = os.path.join(directory, "users.csv")
+        pennywise.users_index_file = os.path.join(directory, "users.idx")
+        pennywise.transactions_file = os.path.join(directory, "transactions.csv")
+        pennywise.transactions_cache_file = os.path.join(directory, "transactions.cache")
+        pennywise.budgets_file = os.path.join(directory, "budgets.csv")
+        pennywise.journal = TransactionJournal(os.path.join(directory, "transactions.journal"))
+        service = PennyWiseService()
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await run_load("127.0.0.1", port, clients, requests, seed)
+        finally:
+            server.close()
+            await server.wait_closed()
+            await service.stop()
+            pennywise.get_user_store().close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="Load a running service instead of starting one")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=100, help="Requests per client after logging in")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.port:
+        report = asyncio.run(run_load(args.host, args.port, args.clients, args.requests, args.seed))
+    else:
+        report = asyncio.run(run_local(args.clients, args.requests, args.seed))
+    print(f"{report['requests']} requests from {report['clients']} clients in {report['seconds']:.2f}s")
+    print(f"{report['requests_per_second']:.0f} requests/s, "
+          f"p50 {report['p50_ms']:.2f} ms, p99 {report['p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Compare the memory of dict transactions with records.Transaction.
+
+Run from the repository root:
+    python -m benchmarks.memory --rows 1000000
+"""
+import argparse
+import datetime
+import tracemalloc
+
+from records import Transaction
+
+
+def build_dicts(rows, date):
+    return [
+        {"id": i, "username": "kim", "type": "expense", "amount": float(i), "category": "Food", "date": date}
+        for i in range(rows)
+    ]
+
+
+def build_records(rows, date):
+    return [Transaction(i, "kim", "expense", float(i), "Food", date) for i in range(rows)]
+
+
+def measure_memory(rows):
+    """Return the bytes per row used by each representation."""
+    date = datetime.date(2024, 12, 9)
+    results = {}
+    for name, build in [("dict", build_dicts), ("slots", build_records)]:
+        tracemalloc.start()
+        ledger = build(rows, date)
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del ledger
+        results[name] = current / rows
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    results = measure_memory(args.rows)
+    for name, per_row in results.items():
+        print(f"{name:<5} {per_row:.0f} bytes/row ({per_row * args.rows / 2 ** 20:.1f} MiB for {args.rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Report cold and warm startup times of pennywise.load_transactions().
+
+Run from the repository root:
+    python -m benchmarks.startup --rows 100000
+"""
+import argparse
+import os
+import tempfile
+
+import pennywise
+from benchmarks.generator import write_transactions_csv
+from journal import TransactionJournal
+
+
+def measure_startup(directory):
+    """Load the ledger in directory twice and return the cold and warm load stats."""
+    pennywise.transactions_file = os.path.join(directory, "transactions.csv")
+    pennywise.transactions_cache_file = os.path.join(directory, "transactions.cache")
+    pennywise.journal = TransactionJournal(os.path.join(directory, "transactions.journal"))
+    results = {}
+    for run in ["cold", "warm"]:
+        pennywise.reset_transactions()
+        pennywise.parse_date.cache_clear()
+        pennywise.load_transactions()
+        results[run] = dict(pennywise.last_load_stats)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        write_transactions_csv(os.path.join(directory, "transactions.csv"), args.rows)
+        results = measure_startup(directory)
+    for run, stats in results.items():
+        print(f"{run:<5} {stats['rows']} rows from {stats['source']:<5} in {stats['seconds'] * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,375 @@
+"""Time the hot paths of every module on a synthetic ledger.
+
+Run from the repository root:
+    python -m benchmarks.suite --scale 10k --output results.json
+    python -m benchmarks.suite --compare before.json after.json
+
+Scales are 10k, 1m and 10m transactions. The results are JSON, tagged with
+the current git commit, so runs from different commits can be compared.
+"""
+import argparse
+import array
+import contextlib
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import expensetrends
+import financial
+import part2
+import pennywise
+from benchmarks import generator
+from binledger import BinaryLedger, write_ledger
+from benchmarks.startup import measure_startup
+from journal import TransactionJournal
+from money import cents_array, sum_cents, sum_cents_by_code
+from records import Transaction
+from transactionAddView import RecurringTransactionManager
+from trends import ExpenseSeries, SpendStats
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a benchmark. It gets (rows, seed, directory) and returns a function to time."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def transaction_rows(rows, seed):
+    return [
+        Transaction(i, username, transaction_type, amount, category, date)
+        for i, (username, transaction_type, amount, category, date)
+        in enumerate(generator.generate_transactions(rows, seed=seed), start=1)
+    ]
+
+
+@benchmark("pennywise.save_transactions")
+def bench_save_transactions(rows, seed, directory):
+    pennywise.transactions_file = os.path.join(directory, "transactions.csv")
+    pennywise.reset_transactions()
+    for transaction in transaction_rows(rows, seed):
+        pennywise.transactions_by_id[transaction["id"]] = transaction
+    return pennywise.save_transactions
+
+
+@benchmark("pennywise.journal_append_1000")
+def bench_journal_append(rows, seed, directory):
+    pennywise.journal = TransactionJournal(os.path.join(directory, "transactions.journal"))
+    pennywise.journal.clear()
+    pennywise.journal_compact_threshold = float("inf")
+    pennywise.reset_transactions()
+    new_rows = list(generator.generate_transactions(1000, seed=seed))
+
+    def run():
+        for username, transaction_type, amount, category, date in new_rows:
+            pennywise.create_transaction(username, transaction_type, amount, category, date)
+    return run
+
+
+@benchmark("pennywise.recent_transactions")
+def bench_recent_transactions(rows, seed, directory):
+    pennywise.reset_transactions()
+    for transaction in transaction_rows(rows, seed):
+        pennywise.index_transaction(transaction)
+    usernames = list(pennywise.user_transactions_index)
+
+    def run():
+        for username in usernames:
+            pennywise.recent_transactions(username, 20)
+    return run
+
+
+def use_user_files(directory):
+    """Point pennywise at an empty users.csv and index in directory."""
+    if pennywise.user_store is not None:
+        pennywise.user_store.close()
+    pennywise.user_store = None
+    pennywise.users = {}
+    pennywise.users_file = os.path.join(directory, "users.csv")
+    pennywise.users_index_file = os.path.join(directory, "users.idx")
+    for path in [pennywise.users_file, pennywise.users_index_file]:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+@benchmark("pennywise.register_users")
+def bench_register_users(rows, seed, directory):
+    use_user_files(directory)
+    users = generator.generate_users(max(10, rows // 100), seed)
+
+    def run():
+        # What register() does per user: check the name is free, then store it
+        for username, password in users:
+            if pennywise.find_user(username) is None:
+                pennywise.add_user(username, password)
+    return run
+
+
+@benchmark("pennywise.login_users")
+def bench_login_users(rows, seed, directory):
+    use_user_files(directory)
+    users = generator.generate_users(max(10, rows // 100), seed)
+    for username, password in users:
+        pennywise.add_user(username, password)
+    pennywise.get_user_store().close()
+    pennywise.user_store = None
+    pennywise.users = {}
+
+    def run():
+        # What login() does per user: look the password up in a store nothing was read from yet
+        for username, _ in users:
+            pennywise.find_user(username)
+    return run
+
+
+def use_budgets(rows, seed, directory):
+    """Point pennywise at a budgets.csv in directory holding one row per generated goal."""
+    pennywise.budgets_file = os.path.join(directory, "budgets.csv")
+    pennywise.budgets = {}
+    for budget in generator.generate_budgets(max(10, rows // 100), seed=seed):
+        pennywise.budgets.setdefault(budget["username"], {})[budget["goal"]] = budget
+    pennywise.save_budgets()
+    pennywise.budgets = {}
+    pennywise.user_totals.clear()
+    pennywise.load_budgets()
+
+
+@benchmark("pennywise.load_budgets")
+def bench_load_budgets(rows, seed, directory):
+    use_budgets(rows, seed, directory)
+
+    def run():
+        pennywise.budgets = {}
+        pennywise.load_budgets()
+    return run
+
+
+@benchmark("pennywise.save_budgets")
+def bench_save_budgets(rows, seed, directory):
+    use_budgets(rows, seed, directory)
+    return pennywise.save_budgets
+
+
+@benchmark("pennywise.add_budget_progress_1000")
+def bench_add_budget_progress(rows, seed, directory):
+    use_budgets(rows, seed, directory)
+    goals = [(username, goal) for username, user_budgets in pennywise.budgets.items() for goal in user_budgets]
+    changes = [goals[i % len(goals)] for i in range(1000)]
+
+    def run():
+        for username, goal in changes:
+            pennywise.add_budget_progress(username, goal, 1.0)
+    return run
+
+
+@benchmark("financial.calculate_financial_summary")
+def bench_financial_summary(rows, seed, directory):
+    manager = financial.BudgetManager()
+    for category, limit in generator.generate_category_limits(seed).items():
+        manager.budgets[category] = {"limit": limit, "spent": 0}
+    manager.store_many(transaction_rows(rows, seed))
+    return manager.calculate_financial_summary
+
+
+@benchmark("financial.month_report")
+def bench_financial_month_report(rows, seed, directory):
+    manager = financial.BudgetManager()
+    manager.store_many(transaction_rows(rows, seed))
+    return lambda: manager.month_report(2021, 6)
+
+
+@benchmark("financial.transactions_in_month")
+def bench_financial_month(rows, seed, directory):
+    manager = financial.BudgetManager()
+    manager.store_many(transaction_rows(rows, seed))
+    return lambda: manager.transactions_in_month(2021, 6)
+
+
+@benchmark("part2.view_all_budgets")
+def bench_part2_budgets(rows, seed, directory):
+    manager = part2.BudgetManager()
+    manager.budgets = generator.generate_category_limits(seed)
+    manager.transactions = [
+        {"category": category, "amount": amount}
+        for _, _, amount, category, _ in generator.generate_transactions(rows, seed=seed)
+    ]
+    # The rows bypass store(), so the first view times the one-pass group-by
+    manager.spent.invalidate()
+    return manager.view_all_budgets
+
+
+@benchmark("part2.view_all_budgets_counted")
+def bench_part2_budgets_counted(rows, seed, directory):
+    manager = part2.BudgetManager()
+    manager.budgets = generator.generate_category_limits(seed)
+    for _, _, amount, category, _ in generator.generate_transactions(rows, seed=seed):
+        manager.store({"category": category, "amount": amount})
+    return manager.view_all_budgets
+
+
+@benchmark("recurring.process_recurring_transactions")
+def bench_recurring(rows, seed, directory):
+    manager = RecurringTransactionManager()
+    manager.recurring_transactions = generator.generate_recurring_rules(max(10, rows // 100), seed)
+    return manager.process_recurring_transactions
+
+
+@benchmark("expensetrends.view_expense_trends")
+def bench_expense_trends(rows, seed, directory):
+    expensetrends.expense_trends.clear()
+    expensetrends.expense_stats.clear()
+    for _, transaction_type, amount, category, date in generator.generate_transactions(rows, seed=seed):
+        if transaction_type == "expense":
+            expensetrends.expense_trends.setdefault(category, ExpenseSeries()).add(amount, date)
+            expensetrends.expense_stats.setdefault(category, SpendStats()).add(amount)
+    return lambda: expensetrends.view_expense_trends("food")
+
+
+@benchmark("expensetrends.all_categories_weekly")
+def bench_expense_trends_all(rows, seed, directory):
+    bench_expense_trends(rows, seed, directory)
+    return lambda: expensetrends.view_expense_trends(period="weekly")
+
+
+def amount_columns(rows, seed):
+    """Return the expense amounts with a category code each, as plain lists."""
+    codes = {category: code for code, category in enumerate(generator.CATEGORIES)}
+    expenses = [(codes[category], amount) for _, transaction_type, amount, category, _
+                in generator.generate_transactions(rows, seed=seed) if transaction_type == "expense"]
+    return [code for code, _ in expenses], [amount for _, amount in expenses]
+
+
+@benchmark("amounts.float_totals")
+def bench_float_totals(rows, seed, directory):
+    codes, amounts = amount_columns(rows, seed)
+
+    def run():
+        totals = [0.0] * len(generator.CATEGORIES)
+        for code, amount in zip(codes, amounts):
+            totals[code] += amount
+        return sum(amounts), totals
+    return run
+
+
+@benchmark("amounts.cents_totals")
+def bench_cents_totals(rows, seed, directory):
+    codes, amounts = amount_columns(rows, seed)
+    codes, cents = array.array("q", codes), cents_array(amounts)
+    return lambda: (sum_cents(cents), sum_cents_by_code(codes, cents, len(generator.CATEGORIES)))
+
+
+@benchmark("binledger.open")
+def bench_binledger_open(rows, seed, directory):
+    path = os.path.join(directory, "transactions.ledger")
+    write_ledger(path, generator.generate_transactions(rows, seed=seed))
+
+    def run():
+        with BinaryLedger(path) as ledger:
+            ledger.row(len(ledger) - 1)
+    return run
+
+
+@benchmark("binledger.totals")
+def bench_binledger_totals(rows, seed, directory):
+    path = os.path.join(directory, "transactions.ledger")
+    write_ledger(path, generator.generate_transactions(rows, seed=seed))
+
+    def run():
+        with BinaryLedger(path) as ledger:
+            ledger.totals("user1")
+    return run
+
+
+def run_startup(rows, seed, directory):
+    """Time cold and warm pennywise.load_transactions() on a fresh CSV."""
+    generator.write_transactions_csv(os.path.join(directory, "transactions.csv"), rows, seed=seed)
+    stats = measure_startup(directory)
+    return {f"pennywise.load_transactions_{run}": {"seconds": stats[run]["seconds"]} for run in stats}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(rows, seed=0, repeat=3, only=None):
+    """Run every registered benchmark and return the results as a dict."""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory, open(os.devnull, "w") as devnull:
+        if not only or any(name.startswith("pennywise.load_transactions") for name in only):
+            results.update(run_startup(rows, seed, directory))
+        for name, setup in BENCHMARKS.items():
+            if only and name not in only:
+                continue
+            timings = []
+            for _ in range(repeat):
+                # Fresh state each time, since several benchmarks change what they measure
+                run = setup(rows, seed, directory)
+                with contextlib.redirect_stdout(devnull):
+                    started = time.perf_counter()
+                    run()
+                    timings.append(time.perf_counter() - started)
+            results[name] = {"seconds": min(timings)}
+    return {
+        "commit": git_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "rows": rows,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def compare(before_path, after_path):
+    """Print the timings of two result files side by side."""
+    with open(before_path) as f:
+        before = json.load(f)
+    with open(after_path) as f:
+        after = json.load(f)
+    print(f"{'benchmark':<45} {before['commit'] or 'before':>12} {after['commit'] or 'after':>12} {'speedup':>8}")
+    for name in sorted(set(before["results"]) | set(after["results"])):
+        old = before["results"].get(name, {}).get("seconds")
+        new = after["results"].get(name, {}).get("seconds")
+        speedup = f"{old / new:.2f}x" if old and new else "-"
+        old_text = f"{old * 1000:.1f} ms" if old is not None else "-"
+        new_text = f"{new * 1000:.1f} ms" if new is not None else "-"
+        print(f"{name:<45} {old_text:>12} {new_text:>12} {speedup:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(generator.SCALES), default="10k")
+    parser.add_argument("--rows", type=int, help="Row count to use instead of --scale")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="Run only these benchmarks")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run_suite(args.rows or generator.SCALES[args.scale], args.seed, args.repeat, args.only)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Check the running budget totals of financial.BudgetManager against a full recompute.
+
+Run from the repository root:
+    python -m benchmarks.verify_ledger --scale 1m --changes 100000
+
+Stores a synthetic ledger, then applies random amount, category, type and
+date updates and deletes before comparing the spent ledger and the monthly
+rollups with totals recomputed from the remaining rows.
+"""
+import argparse
+import datetime
+import random
+import time
+
+import financial
+from benchmarks import generator
+from money import to_cents
+from records import Transaction
+
+
+def verify_ledger(rows, changes, seed=0):
+    """Return how long the changes and the recompute took and which totals disagree."""
+    rng = random.Random(seed)
+    manager = financial.BudgetManager()
+    for category, limit in generator.generate_category_limits(seed).items():
+        manager.budgets[category] = {"limit": limit, "spent": 0.0}
+    manager.store_many(
+        Transaction(id=i, type=transaction_type, amount=amount, category=category, date=date)
+        for i, (_, transaction_type, amount, category, date)
+        in enumerate(generator.generate_transactions(rows, seed=seed), start=1)
+    )
+
+    started = time.perf_counter()
+    for _ in range(changes):
+        if not manager.transactions:
+            break
+        index = rng.randrange(len(manager.transactions))
+        roll = rng.random()
+        if roll < 0.1:
+            manager.remove_at(index)
+            continue
+        if roll < 0.4:
+            change = {"amount": round(rng.uniform(1, 500), 2)}
+        elif roll < 0.7:
+            change = {"category": rng.choice(generator.CATEGORIES)}
+        elif roll < 0.85:
+            change = {"type": rng.choice(["income", "expense"])}
+        else:
+            change = {"date": generator.FIRST_DAY + datetime.timedelta(days=rng.randrange(generator.DAYS))}
+        manager.change(manager.transactions[index], change)
+    change_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    wrong = manager.spent_ledger.verify(manager.transactions)
+    totals = manager.rollups.totals_by_type()
+    for transaction_type in ["income", "expense"]:
+        expected = sum(to_cents(t["amount"]) for t in manager.transactions if t["type"] == transaction_type)
+        if to_cents(totals.get(transaction_type, 0.0)) != expected:
+            wrong.append(f"rollups:{transaction_type}")
+    recompute_seconds = time.perf_counter() - started
+
+    return {
+        "rows": rows,
+        "changes": changes,
+        "seconds_per_change": change_seconds / changes if changes else 0.0,
+        "recompute_seconds": recompute_seconds,
+        "wrong": wrong,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(generator.SCALES), default="10k")
+    parser.add_argument("--rows", type=int, help="Row count to use instead of --scale")
+    parser.add_argument("--changes", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = verify_ledger(args.rows or generator.SCALES[args.scale], args.changes, args.seed)
+    print(f"{report['changes']} changes on {report['rows']} rows: "
+          f"{report['seconds_per_change'] * 1e6:.1f} µs per change, "
+          f"full recompute {report['recompute_seconds'] * 1000:.1f} ms")
+    print("All totals match." if not report["wrong"] else f"Mismatched: {', '.join(report['wrong'])}")
+
+
+if __name__ == "__main__":
+    main()
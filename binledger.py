@@ -0,0 +1,271 @@
+"""Store transactions in a fixed-width binary ledger that is read through mmap.
+
+Run from the repository root:
+    python binledger.py to-binary transactions.csv transactions.ledger
+    python binledger.py to-csv transactions.ledger transactions.csv
+
+Conversions read and write the transactions.journal next to the CSV file
+too (or the one given with --journal): to-binary includes the changes not
+yet compacted into the CSV, and to-csv refuses to replace a CSV whose
+journal still holds changes.
+
+The file is a small header, the username/type/category tables as JSON and
+then one fixed-width column per field (transaction id, user id, type code,
+category code, amount in cents, date ordinal). Opening a ledger maps the file and reads the
+header only; columns are memoryviews (or numpy arrays) straight over the
+mapping, so nothing is parsed or copied until a query touches it.
+"""
+import argparse
+import array
+import csv
+import datetime
+import json
+import mmap
+import os
+import struct
+import sys
+
+import money
+from journal import TransactionJournal
+from money import format_cents, from_cents, sum_cents_by_code, to_cents
+from records import Transaction
+from storage import read_csv_ledger
+
+MAGIC = b"PWLEDGR2"
+HEADER = struct.Struct("<8sQQ")  # magic, row count, size of the name tables
+COLUMNS = [("id", "q"), ("user", "I"), ("type", "B"), ("category", "H"), ("cents", "q"), ("day", "i")]
+CSV_FIELDS = ["id", "username", "type", "amount", "category", "date"]
+ALIGNMENT = 8
+
+
+def aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def column_offsets(start, count):
+    """Return {column: offset} for count rows laid out from start."""
+    offsets = {}
+    for name, code in COLUMNS:
+        offsets[name] = start = aligned(start)
+        start += count * struct.calcsize(code)
+    return offsets
+
+
+def write_ledger(path, rows):
+    """Write (username, type, amount, category, date) rows to a binary ledger and return the count.
+
+    Rows may start with their transaction id as well; rows without one are
+    numbered from 1 by position, the way old snapshots are. The columns are
+    collected as compact arrays first, since the name tables have to be
+    known before they can be written.
+    """
+    if sys.byteorder != "little":
+        raise OSError("Binary ledgers are little-endian only.")
+    tables = {"users": {}, "types": {}, "categories": {}}
+    columns = {name: array.array(code) for name, code in COLUMNS}
+    for position, row in enumerate(rows, start=1):
+        if len(row) == 5:
+            row = (position, *row)
+        transaction_id, username, transaction_type, amount, category, date = row
+        columns["id"].append(transaction_id)
+        columns["user"].append(tables["users"].setdefault(username, len(tables["users"])))
+        columns["type"].append(tables["types"].setdefault(transaction_type, len(tables["types"])))
+        columns["category"].append(tables["categories"].setdefault(category, len(tables["categories"])))
+        columns["cents"].append(to_cents(amount))
+        columns["day"].append(date.toordinal())
+
+    names = json.dumps({table: list(codes) for table, codes in tables.items()}).encode()
+    count = len(columns["cents"])
+    offsets = column_offsets(HEADER.size + len(names), count)
+    temporary_file = path + ".tmp"
+    with open(temporary_file, "wb") as f:
+        f.write(HEADER.pack(MAGIC, count, len(names)))
+        f.write(names)
+        for name, _ in COLUMNS:
+            f.write(b"\0" * (offsets[name] - f.tell()))
+            columns[name].tofile(f)
+    os.replace(temporary_file, path)
+    return count
+
+
+class BinaryLedger:
+    def __init__(self, path):
+        """Map a ledger written by write_ledger() read-only.
+
+        Only the header and name tables are read here; the kernel pages the
+        columns in as queries touch them, so opening costs the same for any
+        file size. Close the ledger (or use it in a with block) after
+        dropping the column views handed out by column() and array().
+        """
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, names_size = HEADER.unpack_from(self.mmap) if len(self.mmap) >= HEADER.size else (b"", 0, 0)
+        if magic != MAGIC:
+            self.mmap.close()
+            raise ValueError(f"'{path}' is not a binary ledger.")
+        tables = json.loads(self.mmap[HEADER.size:HEADER.size + names_size])
+        self.usernames = tables["users"]
+        self.types = tables["types"]
+        self.categories = tables["categories"]
+        self.user_codes = {username: code for code, username in enumerate(self.usernames)}
+        self.offsets = column_offsets(HEADER.size + names_size, self.count)
+        self.view = memoryview(self.mmap)
+        self.columns = {}
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for column in self.columns.values():
+            column.release()
+        self.columns.clear()
+        self.view.release()
+        self.mmap.close()
+
+    def column(self, name):
+        """Return one column as a memoryview over the mapping, without copying."""
+        if name not in self.columns:
+            code = dict(COLUMNS)[name]
+            start = self.offsets[name]
+            self.columns[name] = self.view[start:start + self.count * struct.calcsize(code)].cast(code)
+        return self.columns[name]
+
+    def array(self, name):
+        """Return one column as a read-only numpy array over the mapping, without copying."""
+        return money.numpy.asarray(self.column(name))
+
+    def row(self, index):
+        """Return row index (0-based) as a Transaction."""
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return Transaction(
+            self.column("id")[index],
+            self.usernames[self.column("user")[index]],
+            self.types[self.column("type")[index]],
+            from_cents(self.column("cents")[index]),
+            self.categories[self.column("category")[index]],
+            datetime.date.fromordinal(self.column("day")[index]),
+        )
+
+    def rows(self):
+        """Yield (username, type, amount, category, date) tuples in file order."""
+        columns = (self.column(name) for name in ["user", "type", "category", "cents", "day"])
+        for user, kind, category, cents, day in zip(*columns):
+            yield (self.usernames[user], self.types[kind], from_cents(cents), self.categories[category],
+                   datetime.date.fromordinal(day))
+
+    def user_rows(self, username):
+        """Return the 0-based indexes of one user's rows."""
+        code = self.user_codes.get(username)
+        if code is None:
+            return []
+        if money.numpy is not None:
+            return money.numpy.flatnonzero(self.array("user") == code).tolist()
+        return [index for index, user in enumerate(self.column("user")) if user == code]
+
+    def transactions(self, username):
+        return [self.row(index) for index in self.user_rows(username)]
+
+    def totals(self, username=None):
+        """Return {type: cents} and {category: cents of expenses}, optionally for one user.
+
+        Cents are summed as integers, so the results match the running
+        totals pennywise keeps exactly.
+        """
+        code = self.user_codes.get(username, -1) if username is not None else None
+        expense = self.types.index("expense") if "expense" in self.types else -1
+        if money.numpy is not None:
+            types = self.array("type")
+            categories = self.array("category")
+            cents = self.array("cents")
+            if code is not None:
+                mask = self.array("user") == code
+                types, categories, cents = types[mask], categories[mask], cents[mask]
+            is_expense = types == expense
+            categories, expenses = categories[is_expense], cents[is_expense]
+            present = money.numpy.bincount(categories, minlength=len(self.categories)).tolist()
+            by_type = sum_cents_by_code(types, cents, len(self.types))
+            by_category = [total if seen else None for total, seen in zip(
+                sum_cents_by_code(categories, expenses, len(self.categories)), present)]
+        else:
+            by_type = [0] * len(self.types)
+            by_category = [None] * len(self.categories)
+            columns = (self.column(name) for name in ["user", "type", "category", "cents"])
+            for user, kind, category, cents in zip(*columns):
+                if code is not None and user != code:
+                    continue
+                by_type[kind] += cents
+                if kind == expense:
+                    by_category[category] = (by_category[category] or 0) + cents
+        return (
+            {kind: total for kind, total in zip(self.types, by_type)},
+            {category: total for category, total in zip(self.categories, by_category) if total is not None},
+        )
+
+
+def journal_path(csv_path):
+    """Return the journal pennywise keeps next to a CSV snapshot, e.g. transactions.journal."""
+    return os.path.splitext(csv_path)[0] + ".journal"
+
+
+def csv_to_ledger(csv_path, ledger_path, journal_file=None):
+    """Convert a transactions.csv snapshot and its journal to a binary ledger and return the row count."""
+    rows = read_csv_ledger(csv_path, journal_file or journal_path(csv_path))
+    return write_ledger(ledger_path, (
+        (transaction_id, username, transaction_type, float(amount), category, datetime.date.fromisoformat(date))
+        for transaction_id, (username, transaction_type, amount, category, date) in rows.items()
+    ))
+
+
+def ledger_to_csv(ledger_path, csv_path, journal_file=None):
+    """Write a binary ledger back out in the transactions.csv schema and return the row count.
+
+    The CSV is written next to csv_path and swapped in, so a crash never
+    leaves a truncated snapshot. Raises ValueError if the journal of
+    csv_path still holds changes, since they would be replayed on top.
+    """
+    journal = TransactionJournal(journal_file or journal_path(csv_path))
+    offset, checkpointed = journal.recover()
+    if checkpointed or next(journal.replay(offset), None) is not None:
+        raise ValueError(f"'{journal.path}' holds changes not compacted into '{csv_path}'. "
+                         "Compact it first with: python batch.py compact")
+    temporary_file = csv_path + ".tmp"
+    with BinaryLedger(ledger_path) as ledger:
+        with open(temporary_file, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(CSV_FIELDS)
+            columns = [ledger.column(name) for name in ["id", "user", "type", "cents", "category", "day"]]
+            for transaction_id, user, kind, cents, category, day in zip(*columns):
+                writer.writerow([transaction_id, ledger.usernames[user], ledger.types[kind], format_cents(cents),
+                                 ledger.categories[category], datetime.date.fromordinal(day)])
+            f.flush()
+            os.fsync(f.fileno())
+        count = len(ledger)
+    os.replace(temporary_file, csv_path)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("direction", choices=["to-binary", "to-csv"])
+    parser.add_argument("source")
+    parser.add_argument("target")
+    parser.add_argument("--journal", help="Journal of the CSV file (default: the .journal file next to it)")
+    args = parser.parse_args()
+
+    convert = csv_to_ledger if args.direction == "to-binary" else ledger_to_csv
+    try:
+        count = convert(args.source, args.target, args.journal)
+    except ValueError as e:
+        sys.exit(f"⚠️  {e}")
+    print(f"✅ Converted {count} transactions to {args.target}.")
+
+
+if __name__ == "__main__":
+    main()
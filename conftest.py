@@ -0,0 +1,52 @@
+import pytest
+
+import money
+import pennywise
+from journal import TransactionJournal
+
+
+@pytest.fixture(params=["stdlib", "numpy"])
+def backend(request, monkeypatch):
+    """Run a test with and without numpy, which money holds for every module that uses it."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(money, "numpy", None)
+    return request.param
+
+
+def reset_pennywise_state(monkeypatch):
+    """Give pennywise a fresh, empty in-memory ledger."""
+    monkeypatch.setattr(pennywise, "transactions_by_id", {})
+    monkeypatch.setattr(pennywise, "user_transactions_index", {})
+    monkeypatch.setattr(pennywise, "user_totals", {})
+    monkeypatch.setattr(pennywise, "next_transaction_id", 1)
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch):
+    """Point pennywise at files inside tmp_path and reset its state."""
+    monkeypatch.setattr(pennywise, "transactions_file", str(tmp_path / "transactions.csv"))
+    monkeypatch.setattr(pennywise, "transactions_cache_file", str(tmp_path / "transactions.cache"))
+    monkeypatch.setattr(pennywise, "journal", TransactionJournal(str(tmp_path / "transactions.journal")))
+    monkeypatch.setattr(pennywise, "users_file", str(tmp_path / "users.csv"))
+    monkeypatch.setattr(pennywise, "users_index_file", str(tmp_path / "users.idx"))
+    monkeypatch.setattr(pennywise, "user_store", None)
+    monkeypatch.setattr(pennywise, "users", {})
+    monkeypatch.setattr(pennywise, "budgets_file", str(tmp_path / "budgets.csv"))
+    monkeypatch.setattr(pennywise, "budgets", {})
+    monkeypatch.setattr(pennywise, "budget_rows", 0)
+    monkeypatch.setattr(pennywise, "budget_goals", 0)
+    monkeypatch.setattr(pennywise, "storage", None)
+    reset_pennywise_state(monkeypatch)
+    return tmp_path
+
+
+@pytest.fixture
+def reload_ledger(ledger, monkeypatch):
+    """Return a function that drops the in-memory ledger and loads it from disk."""
+    def reload():
+        reset_pennywise_state(monkeypatch)
+        pennywise.load_transactions()
+        return list(pennywise.transactions_by_id.values())
+    return reload
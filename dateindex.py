@@ -0,0 +1,49 @@
+import bisect
+import datetime
+
+from records import transaction_sort_key
+
+
+class DateIndex:
+    def __init__(self):
+        """Initialize an index that keeps transactions ordered by (date, id)."""
+        self.ordered = []
+
+    def __len__(self):
+        return len(self.ordered)
+
+    def add(self, transaction):
+        """Insert a transaction. Its id must be unique within the index."""
+        bisect.insort(self.ordered, transaction, key=transaction_sort_key)
+
+    def add_many(self, transactions):
+        """Insert many transactions with one sort instead of one insert each."""
+        self.ordered.extend(transactions)
+        self.ordered.sort(key=transaction_sort_key)
+
+    def remove(self, transaction):
+        """Remove a transaction, using its current date and id to find it."""
+        position = bisect.bisect_left(self.ordered, transaction_sort_key(transaction), key=transaction_sort_key)
+        if position == len(self.ordered) or self.ordered[position] is not transaction:
+            raise ValueError("Transaction is not in the index.")
+        del self.ordered[position]
+
+    def between(self, start, end):
+        """Return the transactions dated from start to end (both inclusive), oldest first."""
+        low = bisect.bisect_left(self.ordered, start, key=lambda t: t["date"])
+        high = bisect.bisect_right(self.ordered, end, key=lambda t: t["date"])
+        return self.ordered[low:high]
+
+    def month(self, year, month):
+        """Return the transactions of one calendar month, oldest first."""
+        start = datetime.date(year, month, 1)
+        if month == 12:
+            next_month = datetime.date(year + 1, 1, 1)
+        else:
+            next_month = datetime.date(year, month + 1, 1)
+        return self.between(start, next_month - datetime.timedelta(days=1))
+
+    def last_days(self, days, today=None):
+        """Return the transactions from the last N days, up to and including today."""
+        today = today or datetime.date.today()
+        return self.between(today - datetime.timedelta(days=days - 1), today)
@@ -1,32 +1,78 @@
+import datetime
+
+from money import parse_amount
+from trends import ExpenseSeries, PERIODS, SpendStats, rollup
+
 categories = ["Food", "Transport", "Entertainment", "Utilities", "Others"]
 
-expense_trends = {}
+expense_trends = {}  # category -> ExpenseSeries
+expense_stats = {}  # category -> SpendStats, updated as expenses are added
 
 def add_expense(category, amount, date):
+    if isinstance(date, str):
+        try:
+            date = datetime.date.fromisoformat(date)
+        except ValueError:
+            print("❌ Invalid date! Please use YYYY-MM-DD.\n")
+            return
     if category not in expense_trends:
-        expense_trends[category] = []
-    expense_trends[category].append({"date": date, "amount": amount})
+        expense_trends[category] = ExpenseSeries()
+    expense_trends[category].add(amount, date)
+    if category not in expense_stats:
+        expense_stats[category] = SpendStats()
+    unusual = expense_stats[category].add(amount)
     print(f"\n✅ Expense added: {category} - {amount} on {date}\n")
+    if unusual:
+        stats = expense_stats[category]
+        print(f"⚠️  Unusual spend: {amount} is {stats.last_z:+.1f} standard deviations from your usual {category} spending.\n")
+
 
+def unusual_categories():
+    """Return the categories whose latest expense was unusual."""
+    return [category for category, stats in expense_stats.items() if stats.last_unusual]
+
+
+def print_stats(category):
+    stats = expense_stats.get(category)
+    if stats is None or not stats.count:
+        return
+    print(f"  Average: {stats.mean:.2f} (last {len(stats.recent)}: {stats.window_average:.2f}, "
+          f"trend: {stats.ema:.2f}), std dev: {stats.std:.2f}")
+    if stats.last_unusual:
+        print("  ⚠️  Latest expense was unusual.")
 
-def view_expense_trends(category=None):
+
+def print_rollup(totals, period):
+    for start, total in totals:
+        if period == "monthly":
+            label = start.strftime("%Y-%m")
+        elif period == "weekly":
+            label = f"Week of {start}"
+        else:
+            label = str(start)
+        print(f"  {label}: {total:.2f}")
+
+
+def view_expense_trends(category=None, period="monthly"):
     if not expense_trends:
         print("\n❌ No expenses recorded yet!\n")
         return
 
     if category:
         if category in expense_trends:
-            print(f"\n📊 Trends for {category}:")
-            for i, transaction in enumerate(expense_trends[category], start=1):
-                print(f"  {i}. Date: {transaction['date']}, Amount: {transaction['amount']}")
+            print(f"\n📊 {period.capitalize()} trends for {category}:")
+            print_rollup(rollup([expense_trends[category]], period), period)
+            print_stats(category)
         else:
             print(f"\n❌ No data for category: {category}\n")
     else:
-        print("\n📊 All Expense Trends:")
-        for cat, transactions in expense_trends.items():
+        print(f"\n📊 All Expense Trends ({period}):")
+        for cat, series in expense_trends.items():
             print(f"\nCategory: {cat}")
-            for i, transaction in transactions:
-                print(f"  {i}. Date: {transaction['date']}, Amount: {transaction['amount']}")
+            print_rollup(rollup([series], period), period)
+            print_stats(cat)
+        print("\nAll categories:")
+        print_rollup(rollup(expense_trends.values(), period), period)
 
 
 def menu():
@@ -55,7 +101,7 @@ def menu():
                 continue
 
             try:
-                amount = float(input("Enter amount (e.g., 20.5): ").strip())
+                amount = parse_amount(input("Enter amount (e.g., 20.5): ").strip())
             except ValueError:
                 print("❌ Invalid amount! Please enter a numeric value.\n")
                 continue
@@ -64,11 +110,16 @@ def menu():
         elif choice == "2":
             print("\n=== View Expense Trends ===")
             category = input("Enter category to view (leave blank for all): ").strip()
-            view_expense_trends(category if category else None)
+            period = input("Group by (daily/weekly/monthly, leave blank for monthly): ").strip().lower() or "monthly"
+            if period not in PERIODS:
+                print("❌ Invalid period! Please enter daily, weekly or monthly.\n")
+                continue
+            view_expense_trends(category if category else None, period)
         elif choice == "3":
             print("\n👋 Goodbye! Thanks for using the Expense Tracker.")
             break
         else:
             print("\n❌ Invalid choice! Please enter 1, 2, or 3.\n")
 
-menu()
+if __name__ == "__main__":
+    menu()
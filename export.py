@@ -0,0 +1,61 @@
+import csv
+import gzip
+import itertools
+import json
+
+from money import format_amount
+
+EXPORT_FIELDS = ["date", "type", "category", "amount"]
+CHUNK_SIZE = 10000
+
+
+def open_export(filename):
+    """Open filename for writing text, gzip-compressed if it ends in .gz."""
+    if filename.endswith(".gz"):
+        return gzip.open(filename, mode="wt", newline="")
+    return open(filename, mode="w", newline="")
+
+
+def filter_transactions(transactions, start=None, end=None, username=None):
+    """Lazily keep the transactions dated from start to end (inclusive) that belong to username."""
+    for transaction in transactions:
+        if start is not None and transaction["date"] < start:
+            continue
+        if end is not None and transaction["date"] > end:
+            continue
+        if username is not None and transaction["username"] != username:
+            continue
+        yield transaction
+
+
+def export_value(transaction, field):
+    # Amounts are written on an exact cent, the same way the ledger files store them
+    return format_amount(transaction[field]) if field == "amount" else transaction[field]
+
+
+def export_rows(transactions, filename, file_format=None, fields=EXPORT_FIELDS,
+                start=None, end=None, username=None, chunk_size=CHUNK_SIZE):
+    """Write transactions from any iterable to a CSV or JSON Lines file and return the count.
+
+    Rows are read and written chunk_size at a time, so memory stays flat no
+    matter how long the history is. The format defaults to the extension
+    (.jsonl or .csv, optionally followed by .gz). Both formats write amounts
+    as exact-cent text such as "10.00".
+    """
+    if file_format is None:
+        file_format = "jsonl" if filename.removesuffix(".gz").endswith(".jsonl") else "csv"
+    rows = filter_transactions(transactions, start, end, username)
+    count = 0
+    with open_export(filename) as file:
+        if file_format == "csv":
+            writer = csv.writer(file)
+            writer.writerow([field.capitalize() for field in fields])
+        while chunk := list(itertools.islice(rows, chunk_size)):
+            if file_format == "jsonl":
+                file.writelines(
+                    json.dumps({field: export_value(t, field) for field in fields}, default=str) + "\n" for t in chunk
+                )
+            else:
+                writer.writerows([export_value(t, field) for field in fields] for t in chunk)
+            count += len(chunk)
+    return count
@@ -1,11 +1,21 @@
 import datetime
 
+from dateindex import DateIndex
+from ledger import SpentLedger
+from money import from_cents, parse_amount
+from records import Transaction
+from rollups import MonthlyRollups
+
 
 class BudgetManager:
     def __init__(self):
         """Initialize the Budget Manager with budgets and transactions."""
         self.budgets = {}
         self.transactions = []
+        self.date_index = DateIndex()  # The same transactions, ordered by date
+        self.rollups = MonthlyRollups(self.date_index.month)  # Totals per month, category and type
+        self.spent_ledger = SpentLedger(self.budgets)  # Spent per category, kept in self.budgets too
+        self.next_id = 1
         self.CATEGORIES = ["food", "entertainment", "transport", "salary", "miscellaneous"]
 
     @staticmethod
@@ -26,11 +36,11 @@ class BudgetManager:
             return
 
         try:
-            amount = float(input(f"Enter the budget amount for {category}: "))
+            amount = parse_amount(input(f"Enter the budget amount for {category}: "))
             if amount <= 0:
                 print("Budget amount must be greater than zero.")
                 return
-            self.budgets[category] = {"limit": amount, "spent": 0}
+            self.budgets[category] = {"limit": amount, "spent": self.spent_ledger.spent_in(category)}
             print(f"Budget for '{category}' set to {amount}.")
         except ValueError:
             print("Invalid input. Please enter a valid number.")
@@ -44,7 +54,7 @@ class BudgetManager:
             return
 
         try:
-            amount = float(input("Enter transaction amount: "))
+            amount = parse_amount(input("Enter transaction amount: "))
             if amount <= 0:
                 print("Amount must be a positive number.")
                 return
@@ -65,15 +75,47 @@ class BudgetManager:
             return
 
 
-        transaction = {"type": t_type, "amount": amount, "category": category, "date": date}
-        self.transactions.append(transaction)
-
-
-        if t_type == "expense" and category in self.budgets:
-            self.budgets[category]["spent"] += amount
+        transaction = Transaction(id=self.next_id, type=t_type, amount=amount, category=category, date=date)
+        self.next_id += 1
+        self.store(transaction)
 
         print("Transaction added successfully!")
 
+    def store(self, transaction):
+        """Keep a new transaction and count it in the indexes, rollups and budgets."""
+        self.transactions.append(transaction)
+        self.date_index.add(transaction)
+        self.rollups.add(transaction)
+        self.spent_ledger.add(transaction)
+
+    def store_many(self, transactions):
+        """Keep many new transactions, sorting the date index once."""
+        transactions = list(transactions)
+        self.transactions.extend(transactions)
+        self.date_index.add_many(transactions)
+        for transaction in transactions:
+            self.rollups.add(transaction)
+            self.spent_ledger.add(transaction)
+
+    def change(self, transaction, changes):
+        """Apply {field: value} changes to a stored transaction and keep the totals in step."""
+        self.rollups.remove(transaction)
+        self.spent_ledger.remove(transaction)
+        if "date" in changes:
+            self.date_index.remove(transaction)
+        transaction.update(changes)
+        if "date" in changes:
+            self.date_index.add(transaction)
+        self.rollups.add(transaction)
+        self.spent_ledger.add(transaction)
+
+    def remove_at(self, index):
+        """Delete the transaction at index and take it back out of the totals."""
+        transaction = self.transactions.pop(index)
+        self.date_index.remove(transaction)
+        self.rollups.remove(transaction)
+        self.spent_ledger.remove(transaction)
+
     def view_transactions(self):
         """Display all transactions."""
         if not self.transactions:
@@ -99,10 +141,7 @@ class BudgetManager:
             print("Invalid format. Use MM-YYYY.")
             return
 
-        filtered_transactions = [
-            t for t in self.transactions
-            if t['date'].month == month_year.month and t['date'].year == month_year.year
-        ]
+        filtered_transactions = self.transactions_in_month(month_year.year, month_year.month)
 
         if not filtered_transactions:
             self.print_boxed([f"No transactions found for {month_year.strftime('%B %Y')}."])
@@ -113,8 +152,34 @@ class BudgetManager:
         for idx, transaction in enumerate(filtered_transactions, start=1):
             lines.append(f"{idx}. {transaction['type'].capitalize()} - {transaction['amount']} "
                          f"({transaction['category']}) on {transaction['date']}")
+        lines += self.month_report(month_year.year, month_year.month)
         self.print_boxed(lines)
 
+    def month_report(self, year, month):
+        """Return the total lines of one month, read from the rollups.
+
+        The totals are summed in cents and only converted to pesos for display.
+        """
+        totals = self.rollups.month_cents(year, month)
+        income = sum(cents for (_, t_type), cents in totals.items() if t_type == "income")
+        expenses = sum(cents for (_, t_type), cents in totals.items() if t_type == "expense")
+        lines = [f"Total Income: {from_cents(income)}", f"Total Expenses: {from_cents(expenses)}"]
+        for (category, t_type), cents in sorted(totals.items()):
+            lines.append(f"  {category.capitalize()} ({t_type}): {from_cents(cents)}")
+        return lines
+
+    def transactions_between(self, start, end):
+        """Return the transactions dated from start to end (inclusive), oldest first."""
+        return self.date_index.between(start, end)
+
+    def transactions_in_month(self, year, month):
+        """Return the transactions of one month, oldest first."""
+        return self.date_index.month(year, month)
+
+    def transactions_in_last_days(self, days):
+        """Return the transactions from the last N days (e.g. 90), oldest first."""
+        return self.date_index.last_days(days)
+
     def view_budget_status(self):
         """Check and display the budget status for all categories."""
         if not self.budgets:
@@ -149,7 +214,7 @@ class BudgetManager:
         transaction = self.transactions[transaction_index]
         confirm = input(f"Are you sure you want to delete this transaction? (yes/no): ").strip().lower()
         if confirm == "yes":
-            del self.transactions[transaction_index]
+            self.remove_at(transaction_index)
             print("Transaction deleted successfully!")
         else:
             print("Transaction not deleted.")
@@ -173,21 +238,23 @@ class BudgetManager:
 
         transaction = self.transactions[transaction_index]
         print("Leave fields blank to keep the current value.")
+        changes = {}
 
         t_type = input(f"Enter type (income/expense) [{transaction['type']}]: ").strip().lower()
         if t_type and t_type not in ['income', 'expense']:
             print("Invalid type. Must be 'income' or 'expense'.")
             return
-        transaction['type'] = t_type if t_type else transaction['type']
+        if t_type:
+            changes['type'] = t_type
 
         amount_input = input(f"Enter amount [{transaction['amount']}]: ").strip()
         if amount_input:
             try:
-                amount = float(amount_input)
+                amount = parse_amount(amount_input)
                 if amount <= 0:
                     print("Amount must be a positive number.")
                     return
-                transaction['amount'] = amount
+                changes['amount'] = amount
             except ValueError:
                 print("Invalid amount. Please enter a number.")
                 return
@@ -196,24 +263,26 @@ class BudgetManager:
         if category and category not in self.CATEGORIES:
             print(f"Invalid category. Must be one of {self.CATEGORIES}.")
             return
-        transaction['category'] = category if category else transaction['category']
+        if category:
+            changes['category'] = category
 
         date_input = input(f"Enter date (YYYY-MM-DD) [{transaction['date']}]: ").strip()
         if date_input:
             try:
-                date = datetime.datetime.strptime(date_input, "%Y-%m-%d").date()
-                transaction['date'] = date
+                changes['date'] = datetime.datetime.strptime(date_input, "%Y-%m-%d").date()
             except ValueError:
                 print("Invalid date format. Use YYYY-MM-DD.")
                 return
 
+        # Nothing changes until every answer is valid
+        self.change(transaction, changes)
         print("Transaction updated successfully!")
 
     def calculate_financial_summary(self):
         """Calculate total income, expenses, and remaining budget for each category."""
-        total_income = sum(t['amount'] for t in self.transactions if t['type'] == 'income')
-        total_expenses = sum(t['amount'] for t in self.transactions if t['type'] == 'expense')
-
+        totals = self.rollups.totals_by_type()
+        total_income = totals.get('income', 0.0)
+        total_expenses = totals.get('expense', 0.0)
 
         category_summary = []
         for category, budget in self.budgets.items():
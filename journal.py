@@ -0,0 +1,164 @@
+import csv
+import io
+import os
+import time
+
+from money import format_amount
+
+JOURNAL_FIELDS = ["op", "id", "username", "type", "amount", "category", "date"]
+JOURNAL_OPS = ["add", "update", "delete"]
+SYNC_MODES = ["none", "batch", "commit"]
+CHECKPOINT_OP = "checkpoint"
+NEXT_ID_OP = "next_id"  # The only record of a cleared journal, see clear()
+
+
+class TransactionJournal:
+    def __init__(self, path, flush_records=1, flush_seconds=None, sync="none"):
+        """Initialize the journal that records transaction changes in path.
+
+        Records are buffered and written as one group commit once
+        flush_records are waiting or the oldest has waited flush_seconds.
+        sync picks when the file is fsynced: "none" leaves it to the OS,
+        "batch" syncs once per group commit and "commit" writes and syncs
+        every change before returning.
+        """
+        if sync not in SYNC_MODES:
+            raise ValueError(f"Unknown sync mode '{sync}'.")
+        self.path = path
+        self.flush_records = flush_records
+        self.flush_seconds = flush_seconds
+        self.sync = sync
+        self.records = 0  # Records written since the last compaction
+        self.pending = []  # Records waiting for the next group commit
+        self.pending_since = None
+        self.next_id = 1  # Id the next new transaction gets, as of the last checkpoint
+
+    def append(self, op, transaction):
+        """Append one add/update/delete record for a transaction."""
+        self.append_many(op, [transaction])
+
+    def append_many(self, op, transactions):
+        """Buffer one record per transaction, writing them if a flush is due."""
+        if self.buffer(self.prepare(op, transactions)):
+            self.flush()
+
+    def prepare(self, op, transactions):
+        """Return the records for a change without writing them yet.
+
+        The fields are copied, so the records stay correct even if the
+        transactions change again before write() runs.
+        """
+        if op not in JOURNAL_OPS:
+            raise ValueError(f"Unknown journal operation '{op}'.")
+        rows = [
+            [op, t["id"], t["username"], t["type"], format_amount(t["amount"]), t["category"], t["date"]]
+            for t in transactions
+        ]
+        self.records += len(rows)
+        return rows
+
+    def buffer(self, rows):
+        """Add records to the pending group and return True if it should be flushed."""
+        if not self.pending:
+            self.pending_since = time.monotonic()
+        self.pending.extend(rows)
+        return self.flush_due()
+
+    def flush_due(self):
+        if not self.pending:
+            return False
+        if self.sync == "commit" or len(self.pending) >= self.flush_records:
+            return True
+        return self.flush_seconds is not None and time.monotonic() - self.pending_since >= self.flush_seconds
+
+    def take(self):
+        """Return the pending records and start a new group."""
+        rows = self.pending
+        self.pending = []
+        self.pending_since = None
+        return rows
+
+    def flush(self):
+        """Write every pending record now."""
+        rows = self.take()
+        if rows:
+            self.write(rows)
+
+    def write(self, rows):
+        """Append records with a single write, syncing them unless sync is "none"."""
+        with open(self.path, "a", newline="") as f:
+            csv.writer(f).writerows(rows)
+            if self.sync != "none":
+                f.flush()
+                os.fsync(f.fileno())
+
+    def mark_checkpoint(self, next_id=1):
+        """Record that every record so far is in the new snapshot.
+
+        next_id is the id the next new transaction gets, kept so the ids of
+        rows deleted before the checkpoint are never handed out again. This
+        is the commit point of a checkpoint, so it is always synced.
+        """
+        with open(self.path, "a", newline="") as f:
+            csv.writer(f).writerow([CHECKPOINT_OP, next_id])
+            f.flush()
+            os.fsync(f.fileno())
+
+    def recover(self):
+        """Cut off a torn last record and find where the replay has to start.
+
+        Returns (offset, checkpointed). offset is just past the last
+        checkpoint record, or 0 if there is none. checkpointed is True only
+        if that checkpoint is the newest record: an older one was already
+        swapped in, and nothing says a newer snapshot is complete. The
+        next id of the last checkpoint (or cleared journal) is kept in
+        self.next_id.
+        """
+        offset = 0
+        start = 0
+        self.next_id = 1
+        try:
+            with open(self.path, "rb+") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # The last write was interrupted halfway through a record
+                        f.truncate(offset)
+                        break
+                    offset += len(line)
+                    if line.startswith(CHECKPOINT_OP.encode() + b","):
+                        start = offset
+                        self.next_id = int(line.split(b",")[1])
+                    elif line.startswith(NEXT_ID_OP.encode() + b","):
+                        self.next_id = int(line.split(b",")[1])
+        except FileNotFoundError:
+            pass
+        return start, start > 0 and start == offset
+
+    def replay(self, offset=0):
+        """Yield (op, id, row) for every record from offset on, oldest first."""
+        self.records = 0
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                for row in csv.reader(io.TextIOWrapper(f, newline="")):
+                    if row[0] == NEXT_ID_OP:
+                        continue
+                    self.records += 1
+                    yield row[0], int(row[1]), row[2:]
+        except FileNotFoundError:
+            pass
+
+    def clear(self, next_id=1):
+        """Drop every record once they have been folded into a snapshot.
+
+        The journal is swapped for one holding only next_id, so ids stay
+        unique across compactions even after the newest rows were deleted.
+        """
+        temporary_file = self.path + ".tmp"
+        with open(temporary_file, "w", newline="") as f:
+            csv.writer(f).writerow([NEXT_ID_OP, next_id])
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_file, self.path)
+        self.next_id = next_id
+        self.records = 0
@@ -0,0 +1,97 @@
+from money import from_cents, to_cents
+
+
+def group_totals(transactions, key="category", value="amount", where=None):
+    """Total one field per value of another in a single pass, e.g. spent per category.
+
+    value is a field name or a function of the transaction, e.g. its cents.
+    """
+    totals = {}
+    for transaction in transactions:
+        if where is None or where(transaction):
+            group = transaction[key]
+            amount = value(transaction) if callable(value) else transaction[value]
+            totals[group] = totals.get(group, 0) + amount
+    return totals
+
+
+def cents_of(transaction):
+    return to_cents(transaction["amount"])
+
+
+def is_expense(transaction):
+    # Rows without a type (part2's budget manager) are all expenses
+    return transaction.get("type", "expense") == "expense"
+
+
+class SpentLedger:
+    def __init__(self, budgets=None):
+        """Track how much has been spent per category with signed deltas.
+
+        Every add, update and delete applies its difference, so the totals stay
+        right in O(1) per change. Totals are kept in integer cents, so no
+        rounding error builds up however many changes are applied. budgets
+        ({category: {"limit", "spent"}}) is kept in step: a budgeted
+        category's "spent" follows its total here, in pesos.
+        """
+        self.cents = {}  # category -> total of its expenses in cents
+        self.budgets = budgets if budgets is not None else {}
+        self.stale = False  # Set by invalidate() when rows were changed without the ledger
+
+    def apply(self, transaction, sign):
+        """Add (sign=1) or take back (sign=-1) one transaction."""
+        if not is_expense(transaction):
+            return
+        category = transaction["category"]
+        total = self.cents[category] = self.cents.get(category, 0) + sign * to_cents(transaction["amount"])
+        budget = self.budgets.get(category)
+        if budget is not None:
+            budget["spent"] = from_cents(total)
+
+    def add(self, transaction):
+        self.apply(transaction, 1)
+
+    def remove(self, transaction):
+        self.apply(transaction, -1)
+
+    @property
+    def spent(self):
+        """{category: spent} in pesos."""
+        return {category: from_cents(total) for category, total in self.cents.items()}
+
+    def spent_in(self, category):
+        return from_cents(self.cents.get(category, 0))
+
+    @staticmethod
+    def recompute(transactions):
+        """Return {category: cents spent} from scratch, for checking the running totals."""
+        return group_totals(transactions, value=cents_of, where=is_expense)
+
+    def rebuild(self, transactions):
+        """Start the totals over from transactions in one pass."""
+        self.cents = self.recompute(transactions)
+        self.stale = False
+        for category, budget in self.budgets.items():
+            budget["spent"] = self.spent_in(category)
+
+    def invalidate(self):
+        """Mark the totals out of date after transactions were changed without add() or remove()."""
+        self.stale = True
+
+    def spent_by_category(self, transactions):
+        """Return {category: spent}, rebuilding first from transactions if invalidate() was called."""
+        if self.stale:
+            self.rebuild(transactions)
+        return self.spent
+
+    def verify(self, transactions):
+        """Return the categories whose running total or budget disagrees with a full recompute."""
+        expected = self.recompute(transactions)
+        wrong = []
+        for category in sorted(set(expected) | set(self.cents) | set(self.budgets)):
+            total = expected.get(category, 0)
+            budget = self.budgets.get(category)
+            if self.cents.get(category, 0) != total or (
+                    budget is not None and to_cents(budget["spent"]) != total):
+                wrong.append(category)
+        return wrong
@@ -0,0 +1,92 @@
+import array
+import decimal
+
+try:
+    import numpy
+except ImportError:  # Every module that vectorizes reads money.numpy and falls back to plain loops
+    numpy = None
+
+CENTS = 100
+EXACT_FLOAT_CENTS = 2 ** 53  # float64 holds every integer below this exactly
+
+
+def parse_cents(text):
+    """Parse an amount such as "1,234.50" into integer cents exactly.
+
+    Digits past the second decimal are rounded half up. Raises ValueError
+    for anything that is not a finite number, and for amounts too large to
+    keep as pesos on an exact cent.
+    """
+    try:
+        value = decimal.Decimal(str(text).strip().replace(",", ""))
+        if value.is_finite():
+            cents = (value * CENTS).to_integral_value(rounding=decimal.ROUND_HALF_UP)
+    except decimal.DecimalException:
+        raise ValueError(f"Invalid amount '{text}'.") from None
+    if not value.is_finite():
+        raise ValueError(f"Invalid amount '{text}'.")
+    if abs(cents) >= EXACT_FLOAT_CENTS:
+        raise ValueError(f"Amount '{text}' is too large.")
+    return int(cents)
+
+
+def to_cents(amount):
+    """Return the cents of an amount held as pesos (a float or int)."""
+    return round(amount * CENTS)
+
+
+def from_cents(cents):
+    """Return pesos for display and for the float fields of stored rows."""
+    return cents / CENTS
+
+
+def parse_amount(text):
+    """Parse an amount typed by a user or read from a file, as pesos on an exact cent."""
+    return from_cents(parse_cents(text))
+
+
+def format_cents(cents):
+    """Format cents the way CSV and journal files store them, e.g. "-12.05"."""
+    sign = "-" if cents < 0 else ""
+    pesos, rest = divmod(abs(cents), CENTS)
+    return f"{sign}{pesos}.{rest:02d}"
+
+
+def format_amount(amount):
+    return format_cents(to_cents(amount))
+
+
+def cents_array(amounts=()):
+    """Return a compact array of 64-bit cents for amounts in pesos."""
+    return array.array("q", (to_cents(amount) for amount in amounts))
+
+
+def sum_cents(cents):
+    """Exact total of an array of cents, in one vectorized reduction when numpy is available."""
+    if numpy is not None and isinstance(cents, array.array) and cents.typecode == "q":
+        return int(numpy.frombuffer(cents, dtype=numpy.int64).sum())
+    return sum(cents)
+
+
+def sum_cents_by_code(codes, cents, size):
+    """Total parallel columns of small integer codes (e.g. categories) and cents.
+
+    The columns may be arrays, memoryviews or numpy arrays. Returns a list
+    with the total of every code from 0 to size - 1.
+    """
+    if numpy is not None:
+        # asarray reads arrays and memoryviews in place
+        keys = numpy.asarray(codes)
+        values = numpy.asarray(cents, dtype=numpy.int64)
+        if not len(values):
+            return [0] * size
+        if int(numpy.abs(values).sum()) < EXACT_FLOAT_CENTS:
+            # Every partial sum stays an exact float64, and bincount is far faster than add.at
+            return [int(total) for total in numpy.bincount(keys, weights=values, minlength=size)]
+        totals = numpy.zeros(size, dtype=numpy.int64)
+        numpy.add.at(totals, keys, values)
+        return totals.tolist()
+    totals = [0] * size
+    for code, amount in zip(codes, cents):
+        totals[code] += amount
+    return totals
@@ -1,13 +1,18 @@
+from ledger import SpentLedger
+from money import parse_amount
+
+
 class BudgetManager:
     def __init__(self):
         self.budgets = {}  # Stores budget limits for each category
         self.transactions = []  # Stores transaction history
+        self.spent = SpentLedger()  # Spent per category, updated by store() and remove()
 
     def set_budget(self):
         """Set a budget limit for a category."""
         category = input("Enter the category name: ")
         try:
-            amount = float(input(f"Enter the budget amount for {category}: "))
+            amount = parse_amount(input(f"Enter the budget amount for {category}: "))
             if amount <= 0:
                 print("Budget amount must be greater than zero.")
                 return
@@ -23,22 +28,32 @@ class BudgetManager:
             print(f"No budget set for category '{category}'. Please set a budget first.")
             return
         try:
-            amount = float(input(f"Enter the transaction amount for {category}: "))
+            amount = parse_amount(input(f"Enter the transaction amount for {category}: "))
             if amount <= 0:
                 print("Transaction amount must be greater than zero.")
                 return
-            self.transactions.append({"category": category, "amount": amount})
+            self.store({"category": category, "amount": amount})
             print(f"Transaction added: {category} - {amount}")
         except ValueError:
             print("Invalid input. Please enter a valid number.")
 
+    def store(self, transaction):
+        """Keep a new transaction and count it in the spent totals."""
+        self.transactions.append(transaction)
+        self.spent.add(transaction)
+
+    def remove(self, transaction):
+        """Delete a transaction and take it back out of the spent totals."""
+        self.transactions.remove(transaction)
+        self.spent.remove(transaction)
+
     def get_budget_status(self):
         """Check the remaining budget for a category."""
         category = input("Enter the category to check the budget status: ")
         if category not in self.budgets:
             print(f"No budget set for category '{category}'.")
             return
-        total_spent = sum(t['amount'] for t in self.transactions if t['category'] == category)
+        total_spent = self.spent.spent_by_category(self.transactions).get(category, 0.0)
         remaining = self.budgets[category] - total_spent
         print(f"\nCategory: {category}\nBudget: {self.budgets[category]}\nSpent: {total_spent}\nRemaining: {remaining}\n")
 
@@ -48,8 +63,9 @@ class BudgetManager:
             print("No budgets set.")
             return
         print("\nBudget Summary:")
+        spent = self.spent.spent_by_category(self.transactions)
         for category in self.budgets:
-            total_spent = sum(t['amount'] for t in self.transactions if t['category'] == category)
+            total_spent = spent.get(category, 0.0)
             remaining = self.budgets[category] - total_spent
             print(f"Category: {category}\nBudget: {self.budgets[category]}\nSpent: {total_spent}\nRemaining: {remaining}\n")
 
@@ -1,80 +1,549 @@
+import bisect
 import csv
 import datetime
+import functools
+import hashlib
+import io
+import os
+import pickle
+import sys
+import time
+
+from journal import TransactionJournal
+from money import format_amount, from_cents, parse_amount, to_cents
+from records import Transaction, transaction_sort_key
+from storage import SQLiteStorage
+from userstore import UserStore
 
 users_file = "users.csv"
+users_index_file = "users.idx"
 transactions_file = "transactions.csv"
-users = {}
+budgets_file = "budgets.csv"
+journal_file = "transactions.journal"
+transactions_cache_file = "transactions.cache"
+use_transactions_cache = True  # Reuse the parsed CSV snapshot while the file is unchanged
+journal_mode = True  # Append each change to the journal instead of rewriting the CSV
+journal_compact_threshold = 1000  # Fold the journal into the CSV after this many records
+journal = TransactionJournal(journal_file)
+background_writer = None  # Optional callable that takes over disk writes, see persist()
+storage = None  # Optional backend (e.g. SQLiteStorage) used instead of the CSV files
+user_store = None  # Opened on first use, see get_user_store()
+users = {}  # Users looked up so far, username -> password
 logged_in_users = {}
-transactions = []
+transactions_by_id = {}  # id -> transaction, in the order they were added
+user_transactions_index = {}  # username -> that user's transactions, ordered by (date, id)
+user_totals = {}  # username -> running income/expense/category/budget totals, in cents
+check_totals = False  # Verify the running totals against a full recompute on every summary
+next_transaction_id = 1
+last_load_stats = {}  # Where the last load_transactions() read from and how long it took
 categories = ["Food", "Transport", "Entertainment", "Utilities"]
-budgets = {}
+budgets = {}  # username -> {goal: budget}
+budget_rows = 0  # Rows in budgets.csv, counting the ones later rows replaced
+budget_goals = 0  # Goals in budgets, so persist_budget() does not have to count them
 user_balances = {}
 user_income_periods = {}
 
 # Helper Functions
-def save_users():
-    """Save user data to CSV file."""
-    with open(users_file, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["username", "password"])
-        for username, password in users.items():
-            writer.writerow([username, password])
+def use_storage(backend):
+    """Keep users, transactions and budgets in backend instead of the CSV files."""
+    global storage, next_transaction_id
+    storage = backend
+    next_transaction_id = backend.next_transaction_id()
+
+def get_user_store():
+    """Return the indexed user store for users_file, opening it if needed."""
+    global user_store
+    if user_store is None:
+        user_store = UserStore(users_file, users_index_file)
+    return user_store
+
+def find_user(username):
+    """Return the password of one user, or None, without loading every account."""
+    if username not in users:
+        if storage is not None:
+            password = storage.get_user(username)
+        else:
+            password = get_user_store().get(username)
+        if password is None:
+            return None
+        users[username] = password
+    return users[username]
+
+def add_user(username, password):
+    """Store a new user. The caller checks that the username is free.
+
+    Raises ValueError for a username or password users.csv cannot hold.
+    """
+    if storage is not None:
+        storage.add_user(username, password)
+    else:
+        get_user_store().add(username, password)
+    users[username] = password
 
-def load_users():
-    """Load user data from CSV file."""
-    try:
-        with open(users_file, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                users[row["username"]] = row["password"]
-    except FileNotFoundError:
-        pass
+def persist(write):
+    """Run a disk write now, or hand it to background_writer if one is set.
+
+    write must not read shared state: everything it saves is captured
+    before it is passed in, so it can run later on another thread.
+    """
+    if background_writer is None:
+        write()
+    else:
+        background_writer(write)
+
+def write_snapshot(rows):
+    """Write a complete snapshot next to transactions_file and sync it."""
+    with open(transactions_file + ".tmp", "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "username", "type", "amount", "category", "date"])
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+
+def replace_snapshot(rows):
+    write_snapshot(rows)
+    os.replace(transactions_file + ".tmp", transactions_file)
+
+def checkpoint(rows, next_id):
+    """Swap in a new snapshot and retire the journal records it covers.
+
+    A crash at any step leaves either the old snapshot and the whole journal
+    or a checkpoint record telling load_transactions() to finish the swap.
+    """
+    write_snapshot(rows)
+    journal.mark_checkpoint(next_id)
+    os.replace(transactions_file + ".tmp", transactions_file)
+    journal.clear(next_id)
+
+def snapshot_rows():
+    return [
+        [t["id"], t["username"], t["type"], format_amount(t["amount"]), t["category"], t["date"]]
+        for t in transactions_by_id.values()
+    ]
 
 def save_transactions():
     """Save transactions to CSV file."""
-    with open(transactions_file, "w", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(["username", "type", "amount", "category", "date"])
-        for transaction in transactions:
-            writer.writerow([
-                transaction["username"],
-                transaction["type"],
-                transaction["amount"],
-                transaction["category"],
-                transaction["date"],
-            ])
+    persist(functools.partial(replace_snapshot, snapshot_rows()))
+
+@functools.lru_cache(maxsize=65536)
+def parse_date(value):
+    """Convert a YYYY-MM-DD string to a date, reusing earlier results."""
+    return datetime.date.fromisoformat(value)
+
+def parse_transaction(transaction_id, row):
+    """Build a transaction from a [username, type, amount, category, date] row."""
+    return Transaction(
+        transaction_id,
+        sys.intern(row[0]),
+        sys.intern(row[1]),
+        float(row[2]),
+        sys.intern(row[3]),
+        parse_date(row[4]),
+    )
+
+def read_transaction_rows():
+    """Return the CSV snapshot as (id, username, type, amount, category, date) tuples.
+
+    Snapshots written before ids were stored are numbered by position, the
+    way the journal written next to them numbered them.
+
+    The parsed rows are cached in transactions_cache_file together with the
+    CSV's size and a hash of its contents, so a warm start skips parsing
+    entirely, and a rewrite that keeps the size and modification time (coarse
+    clocks, copies) is still noticed. Hashing costs far less than parsing.
+    """
+    with open(transactions_file, "rb") as f:
+        # "id" names the row layout, so caches of snapshots numbered by position are reparsed
+        key = ("id", os.fstat(f.fileno()).st_size, hashlib.file_digest(f, "blake2b").hexdigest())
+    if use_transactions_cache:
+        try:
+            with open(transactions_cache_file, "rb") as f:
+                cached_key, rows = pickle.load(f)
+            if cached_key == key:
+                return rows, "cache"
+        except (FileNotFoundError, EOFError, ValueError, pickle.UnpicklingError):
+            pass
+
+    rows = []
+    intern = sys.intern
+    with open(transactions_file, "r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header:
+            u, t, a, c, d = (header.index(name) for name in ["username", "type", "amount", "category", "date"])
+            i = header.index("id") if "id" in header else None
+            for position, row in enumerate(reader, start=1):
+                rows.append((int(row[i]) if i is not None else position, intern(row[u]), intern(row[t]),
+                             float(row[a]), intern(row[c]), parse_date(row[d])))
+
+    if use_transactions_cache:
+        # Write a new file and swap it in, so a crash never leaves a torn cache
+        temporary_file = transactions_cache_file + ".tmp"
+        with open(temporary_file, "wb") as f:
+            pickle.dump((key, rows), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, transactions_cache_file)
+    return rows, "csv"
+
+def reset_transactions():
+    """Forget every loaded transaction, index and running total."""
+    global next_transaction_id
+    transactions_by_id.clear()
+    user_transactions_index.clear()
+    user_totals.clear()
+    next_transaction_id = 1
 
 def load_transactions():
-    """Load transactions from CSV file."""
+    """Load transactions from the CSV snapshot and replay the journal on top."""
+    global next_transaction_id
+    if storage is not None:
+        # Each user's rows are loaded from the backend on first use instead
+        return
+    started = time.perf_counter()
+    offset, checkpointed = journal.recover()
+    if checkpointed:
+        # The last checkpoint was interrupted after its commit point: finish the swap
+        # and retire the journal before anything new is appended behind the marker
+        if os.path.exists(transactions_file + ".tmp"):
+            os.replace(transactions_file + ".tmp", transactions_file)
+        journal.clear(journal.next_id)
+        offset = 0
+    elif os.path.exists(transactions_file + ".tmp"):
+        os.remove(transactions_file + ".tmp")
     try:
-        with open(transactions_file, "r") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                transactions.append({
-                    "username": row["username"],
-                    "type": row["type"],
-                    "amount": float(row["amount"]),
-                    "category": row["category"],
-                    "date": datetime.datetime.strptime(row["date"], "%Y-%m-%d").date(),
-                })
+        rows, source = read_transaction_rows()
     except FileNotFoundError:
-        pass
+        rows, source = [], "none"
+    for transaction_id, username, transaction_type, amount, category, date in rows:
+        transactions_by_id[transaction_id] = Transaction(
+            transaction_id, username, transaction_type, amount, category, date,
+        )
+    # Ids are never reused, even those of rows deleted before the last checkpoint
+    next_transaction_id = max(journal.next_id, max(transactions_by_id, default=0) + 1)
+
+    for op, transaction_id, row in journal.replay(offset):
+        if op == "add":
+            transactions_by_id[transaction_id] = parse_transaction(transaction_id, row)
+            next_transaction_id = max(next_transaction_id, transaction_id + 1)
+        elif op == "update":
+            transactions_by_id[transaction_id].update(parse_transaction(transaction_id, row))
+        elif op == "delete":
+            del transactions_by_id[transaction_id]
+
+    # Build the per-user index and totals in one pass, then order each user's rows once
+    for transaction in transactions_by_id.values():
+        user_transactions_index.setdefault(transaction["username"], []).append(transaction)
+        apply_totals(transaction, 1)
+    for user_transactions in user_transactions_index.values():
+        user_transactions.sort(key=transaction_sort_key)
+
+    last_load_stats.update(source=source, rows=len(transactions_by_id), journal_records=journal.records,
+                           seconds=time.perf_counter() - started)
+
+def budget_cents(username):
+    return sum(to_cents(b["progress"]) for b in get_user_budgets(username).values())
+
+def get_user_totals(username):
+    """Return the running totals of one user in integer cents, creating them if needed."""
+    if username not in user_totals:
+        user_totals[username] = {
+            "income": 0,
+            "expense": 0,
+            "categories": {},
+            "budget": budget_cents(username),
+        }
+    return user_totals[username]
+
+def get_user_summary(username):
+    """Return the totals of one user in pesos, with the balance left after budgets."""
+    totals = get_user_totals(username)
+    return {
+        "income": from_cents(totals["income"]),
+        "expense": from_cents(totals["expense"]),
+        "budget": from_cents(totals["budget"]),
+        "balance": from_cents(totals["income"] - totals["expense"] - totals["budget"]),
+        "categories": {category: from_cents(cents) for category, cents in totals["categories"].items()},
+    }
+
+def apply_totals(transaction, sign):
+    """Add (sign=1) or take back (sign=-1) a transaction from its owner's totals."""
+    totals = get_user_totals(transaction["username"])
+    cents = sign * to_cents(transaction["amount"])
+    if transaction["type"] == "income":
+        totals["income"] += cents
+    elif transaction["type"] == "expense":
+        totals["expense"] += cents
+        category = transaction["category"]
+        totals["categories"][category] = totals["categories"].get(category, 0) + cents
+
+def compute_totals(username):
+    """Recompute one user's totals from scratch."""
+    totals = {"income": 0, "expense": 0, "categories": {}, "budget": 0}
+    for t in get_user_transactions(username):
+        if t["type"] == "income":
+            totals["income"] += to_cents(t["amount"])
+        elif t["type"] == "expense":
+            cents = to_cents(t["amount"])
+            totals["expense"] += cents
+            totals["categories"][t["category"]] = totals["categories"].get(t["category"], 0) + cents
+    totals["budget"] = budget_cents(username)
+    return totals
+
+def verify_totals(username):
+    """Check the running totals of a user against a full recompute."""
+    totals = get_user_totals(username)
+    expected = compute_totals(username)
+    categories = set(totals["categories"]) | set(expected["categories"])
+    return all(totals[key] == expected[key] for key in ["income", "expense", "budget"]) and all(
+        totals["categories"].get(category, 0) == expected["categories"].get(category, 0) for category in categories
+    )
+
+def insert_user_transaction(transaction):
+    """Insert a transaction into its owner's date-ordered list."""
+    user_transactions = user_transactions_index.setdefault(transaction["username"], [])
+    bisect.insort(user_transactions, transaction, key=transaction_sort_key)
+
+def delete_user_transaction(transaction):
+    """Remove a transaction from its owner's date-ordered list."""
+    user_transactions = user_transactions_index[transaction["username"]]
+    position = bisect.bisect_left(user_transactions, transaction_sort_key(transaction), key=transaction_sort_key)
+    del user_transactions[position]
+
+def index_transaction(transaction):
+    """Add a transaction to the ledger, its owner's index and totals."""
+    transactions_by_id[transaction["id"]] = transaction
+    insert_user_transaction(transaction)
+    apply_totals(transaction, 1)
+
+def unindex_transaction(transaction):
+    """Remove a transaction from the ledger, its owner's index and totals."""
+    del transactions_by_id[transaction["id"]]
+    delete_user_transaction(transaction)
+    apply_totals(transaction, -1)
+
+def get_user_transactions(username):
+    """Return the transactions of one user without scanning the whole ledger."""
+    if storage is not None and username not in user_transactions_index:
+        user_transactions_index[username] = []
+        for transaction in storage.load_user_transactions(username):
+            index_transaction(transaction)
+    return user_transactions_index.get(username, [])
+
+def recent_transactions(username, limit, before=None):
+    """Return up to limit of a user's transactions, newest first.
+
+    before is a (date, id) cursor taken from the last row already shown;
+    only older transactions are returned. Each page costs O(log n + limit).
+    """
+    user_transactions = get_user_transactions(username)
+    if before is None:
+        end = len(user_transactions)
+    else:
+        end = bisect.bisect_left(user_transactions, before, key=transaction_sort_key)
+    return user_transactions[max(0, end - limit):end][::-1]
+
+def compact_transactions():
+    """Checkpoint: fold the journal back into the CSV snapshot."""
+    if storage is not None:
+        return
+    journal.take()  # Buffered records are already in the snapshot
+    journal.records = 0
+    # Rows keep their ids in the snapshot, and next_transaction_id outlives them
+    persist(functools.partial(checkpoint, snapshot_rows(), next_transaction_id))
+
+def record_change(op, transaction):
+    """Persist a single add/update/delete of a transaction."""
+    record_changes(op, [transaction])
+
+def record_changes(op, changed):
+    """Persist the same add/update/delete of many transactions with a single write."""
+    if storage is not None:
+        storage.record_many(op, changed)
+        return
+    if not journal_mode:
+        save_transactions()
+        return
+    if journal.buffer(journal.prepare(op, changed)):
+        flush()
+    if journal.records >= journal_compact_threshold:
+        compact_transactions()
+
+def flush():
+    """Write the buffered journal records as one group commit."""
+    rows = journal.take()
+    if rows:
+        persist(functools.partial(journal.write, rows))
+
+def create_transaction(username, transaction_type, amount, category, date):
+    """Store a new transaction and return it."""
+    return add_transactions([(username, transaction_type, amount, category, date)])[0]
+
+def add_transactions(rows):
+    """Store many (username, type, amount, category, date) rows and persist them at once."""
+    global next_transaction_id
+    added = []
+    for username, transaction_type, amount, category, date in rows:
+        get_user_transactions(username)  # Make sure the user's rows are loaded first
+        transaction = Transaction(next_transaction_id, username, transaction_type, amount, category, date)
+        next_transaction_id += 1
+        index_transaction(transaction)
+        added.append(transaction)
+    if added:
+        record_changes("add", added)
+    return added
+
+def modify_transaction(transaction, field, value):
+    """Change one field of a stored transaction."""
+    apply_totals(transaction, -1)
+    if field == "date":
+        delete_user_transaction(transaction)
+        transaction[field] = value
+        insert_user_transaction(transaction)
+    else:
+        transaction[field] = value
+    apply_totals(transaction, 1)
+    record_change("update", transaction)
+
+def remove_transaction(transaction):
+    """Delete a stored transaction."""
+    unindex_transaction(transaction)
+    record_change("delete", transaction)
+
+def get_user_budgets(username):
+    """Return the goal -> budget dict of one user."""
+    return budgets.get(username, {})
+
+def load_budgets():
+    """Load budget goals, keeping the last row for each (username, goal).
+
+    Rows whose fields do not parse, such as one cut short by an interrupted
+    append, are skipped.
+    """
+    global budget_rows, budget_goals
+    if storage is not None:
+        rows = storage.load_budgets()
+    else:
+        rows = []
+        budget_rows = 0
+        try:
+            with open(budgets_file, "r", newline="") as f:
+                for row in csv.DictReader(f):
+                    budget_rows += 1
+                    try:
+                        rows.append({
+                            "goal": row["goal"],
+                            "progress": parse_amount(row["progress"]),
+                            "start_date": parse_date(row["start_date"]),
+                            "end_date": parse_date(row["end_date"]),
+                            "username": row["username"],
+                        })
+                    except (TypeError, ValueError):
+                        continue
+        except FileNotFoundError:
+            pass
+    for row in rows:
+        budgets.setdefault(row["username"], {})[row["goal"]] = {
+            "progress": row["progress"],
+            "start_date": row["start_date"],
+            "end_date": row["end_date"],
+            "username": row["username"],
+        }
+    budget_goals = sum(len(user_budgets) for user_budgets in budgets.values())
+    for username in budgets:
+        if username in user_totals:
+            user_totals[username]["budget"] = budget_cents(username)
+
+def write_budgets_csv(rows):
+    temporary_file = budgets_file + ".tmp"
+    with open(temporary_file, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["goal", "progress", "start_date", "end_date", "username"])
+        writer.writerows(rows)
+    os.replace(temporary_file, budgets_file)
+
+def append_budget_row(row):
+    line = io.StringIO()
+    csv.writer(line).writerow(row)
+    with open(budgets_file, "ab+") as f:
+        if f.tell() == 0:
+            f.write(b"goal,progress,start_date,end_date,username\r\n")
+        else:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\r\n")
+        f.write(line.getvalue().encode())
+
+def budget_row(username, goal):
+    budget = budgets[username][goal]
+    return [goal, format_amount(budget["progress"]), budget["start_date"], budget["end_date"], username]
+
+def save_budgets():
+    """Rewrite budgets.csv with one row per (username, goal)."""
+    global budget_rows
+    rows = [budget_row(username, goal) for username, goals in budgets.items() for goal in goals]
+    budget_rows = len(rows)
+    persist(functools.partial(write_budgets_csv, rows))
+
+def persist_budget(username, goal):
+    """Save one goal of a user after it was created or changed.
+
+    The goal's new row is appended, and load_budgets() keeps the last row of
+    each goal. Once replaced rows make up more than half the file, it is
+    rewritten with one row per goal.
+    """
+    global budget_rows
+    if storage is not None:
+        storage.save_budget(username, goal, budgets[username][goal])
+        return
+    budget_rows += 1
+    if budget_rows > 2 * budget_goals:
+        save_budgets()
+    else:
+        persist(functools.partial(append_budget_row, budget_row(username, goal)))
+
+def create_budget(username, goal, start_date, end_date):
+    """Create (or replace) a budget goal of a user and return it."""
+    global budget_goals
+    user_budgets = budgets.setdefault(username, {})
+    if goal in user_budgets:
+        get_user_totals(username)["budget"] -= to_cents(user_budgets[goal]["progress"])
+    else:
+        budget_goals += 1
+    user_budgets[goal] = {
+        "progress": 0.0,
+        "start_date": start_date,
+        "end_date": end_date,
+        "username": username,
+    }
+    persist_budget(username, goal)
+    return user_budgets[goal]
+
+def add_budget_progress(username, goal, amount):
+    """Add an amount to the progress of a goal, updating it in place."""
+    budget = budgets[username][goal]
+    cents = to_cents(amount)
+    budget["progress"] = from_cents(to_cents(budget["progress"]) + cents)
+    get_user_totals(username)["budget"] += cents
+    persist_budget(username, goal)
+    return budget
 
 def register():
     print("\n--- REGISTER ---")
     username = input("Enter username to register: ").strip()
-    if username in users:
+    if find_user(username) is not None:
         print("⚠️  User already exists. Please choose a different username.")
         return
     password = input("Enter password: ").strip()
-    users[username] = password
-    save_users()
+    try:
+        add_user(username, password)
+    except ValueError as e:
+        print(f"⚠️  {e}")
+        return
     print(f"✅ User '{username}' registered successfully!")
 
 def login():
     print("\n--- LOGIN ---")
     username = input("Enter username: ").strip()
-    if username not in users:
+    if find_user(username) is None:
         print("⚠️  User does not exist. Please register first.")
         return None
     password = input("Enter password: ").strip()
@@ -86,6 +555,7 @@ def login():
     return username
 
 def logout(username):
+    flush()
     if username in logged_in_users:
         del logged_in_users[username]
         print(f"👋 Goodbye, {username}. You have been logged out.")
@@ -100,7 +570,7 @@ def add_transaction(username):
         return
 
     try:
-        amount = float(input("Enter transaction amount: ").strip())
+        amount = parse_amount(input("Enter transaction amount: ").strip())
         if amount <= 0:
             raise ValueError
     except ValueError:
@@ -119,14 +589,8 @@ def add_transaction(username):
             return
         user_balances[username] = user_balances.get(username, 0) + amount
         user_income_periods[username] = {"start_date": start_date, "period_type": period}
-        transactions.append({
-            "username": username,
-            "type": "income",
-            "amount": amount,
-            "category": "Income",  # Default category for income
-            "date": datetime.date.today(),
-        })
-        save_transactions()
+        # Default category for income
+        create_transaction(username, "income", amount, "Income", datetime.date.today())
         print(f"✅ Income added. Balance: ₱{user_balances[username]:.2f}")
 
     elif transaction_type == "expense":
@@ -156,24 +620,17 @@ def add_transaction(username):
             return
         
         user_balances[username] -= amount
-        transactions.append({
-            "username": username,
-            "type": "expense",
-            "amount": amount,
-            "category": category if category else "Uncategorized",
-            "date": date,
-        })
-        save_transactions()
+        create_transaction(username, "expense", amount, category if category else "Uncategorized", date)
         print(f"✅ Expense recorded. Remaining balance: ₱{user_balances[username]:.2f}")
 
 def view_transactions(username):
     print("\n--- VIEW TRANSACTIONS ---")
-    user_transactions = [t for t in transactions if t["username"] == username]
+    user_transactions = get_user_transactions(username)
     if not user_transactions:
         print("📂 No transactions found.")
         return
 
-    total_income = sum(t["amount"] for t in user_transactions if t["type"] == "income")
+    totals = get_user_totals(username)
     income_period = user_income_periods.get(username, None)
     
     remaining_balance = 0
@@ -188,12 +645,11 @@ def view_transactions(username):
             days_in_week = 7
             remaining_days = max(0, (start_date + datetime.timedelta(days=days_in_week)).day - today.day)
         
-        remaining_balance = total_income - sum(t["amount"] for t in user_transactions if t["type"] == "expense")
+        remaining_balance = from_cents(totals["income"] - totals["expense"])
         period_remaining_text = f"Remaining balance for this {period_type.capitalize()}: ₱{remaining_balance:.2f}"
     else:
         period_remaining_text = "No income set for this period."
 
-    user_transactions.sort(key=lambda x: x["date"], reverse=True)
     try:
         limit_options = [5, 10, 15, 20]
         print(f"Available options: {limit_options}")
@@ -205,27 +661,34 @@ def view_transactions(username):
         print("⚠️ Invalid input. Defaulting to 5 transactions.")
         limit = 5
 
-    displayed_transactions = user_transactions[:limit]
+    displayed_transactions = []
+    page = recent_transactions(username, limit)
     print(f"\n{period_remaining_text}")
-    print("+----+------------+------------+------------+------------+")
-    print("| #  |   Type     |   Amount   |   Category | Date       |")
-    print("+----+------------+------------+------------+------------+")
-    for i, t in enumerate(displayed_transactions, start=1):
-        print(f"| {i:<2} |   {t['type'].capitalize():<8} |   ₱{t['amount']:<7.2f} | {t['category']:<8} | {t['date']} |")
-    print("+----+------------+------------+------------+------------+")
+    while True:
+        print("+----+------------+------------+------------+------------+")
+        print("| #  |   Type     |   Amount   |   Category | Date       |")
+        print("+----+------------+------------+------------+------------+")
+        for i, t in enumerate(page, start=len(displayed_transactions) + 1):
+            print(f"| {i:<2} |   {t['type'].capitalize():<8} |   ₱{t['amount']:<7.2f} | {t['category']:<8} | {t['date']} |")
+        print("+----+------------+------------+------------+------------+")
+        displayed_transactions.extend(page)
+        if len(displayed_transactions) == len(user_transactions):
+            break
+        if input("Load older transactions? (yes/no): ").strip().lower() != "yes":
+            break
+        page = recent_transactions(username, limit, before=transaction_sort_key(page[-1]))
+    return displayed_transactions
 
 def delete_transaction(username):
     print("\n--- DELETE TRANSACTION ---")
-    view_transactions(username)
-    user_transactions = [t for t in transactions if t["username"] == username]
+    user_transactions = view_transactions(username)
     if not user_transactions:
         return
     try:
         transaction_index = int(input(f"Enter the number of the transaction to delete: ")) - 1
         if 0 <= transaction_index < len(user_transactions):
             transaction_to_delete = user_transactions[transaction_index]
-            transactions.remove(transaction_to_delete)
-            save_transactions()
+            remove_transaction(transaction_to_delete)
             print(f"✅ Transaction deleted.")
         else:
             print("⚠️  Invalid transaction number.")
@@ -234,8 +697,7 @@ def delete_transaction(username):
 
 def update_transaction(username):
     print("\n--- UPDATE TRANSACTION ---")
-    view_transactions(username)
-    user_transactions = [t for t in transactions if t["username"] == username]
+    user_transactions = view_transactions(username)
     if not user_transactions:
         return
     try:
@@ -245,18 +707,18 @@ def update_transaction(username):
             print(f"Current details: {transaction}")
             update_field = input("What would you like to update? (type/amount/category/date): ").strip().lower()
             if update_field == "type":
-                transaction["type"] = input("Enter new type (income/expense): ").strip().lower()
+                value = input("Enter new type (income/expense): ").strip().lower()
             elif update_field == "amount":
-                transaction["amount"] = float(input("Enter new amount: ").strip())
+                value = parse_amount(input("Enter new amount: ").strip())
             elif update_field == "category":
-                transaction["category"] = input(f"Enter new category {categories}: ").strip()
+                value = input(f"Enter new category {categories}: ").strip()
             elif update_field == "date":
                 date_input = input("Enter new date (YYYY-MM-DD): ").strip()
-                transaction["date"] = datetime.datetime.strptime(date_input, "%Y-%m-%d").date()
+                value = datetime.datetime.strptime(date_input, "%Y-%m-%d").date()
             else:
                 print("⚠️  Invalid field.")
                 return
-            save_transactions()
+            modify_transaction(transaction, update_field, value)
             print("✅ Transaction updated successfully!")
         else:
             print("⚠️  Invalid transaction number.")
@@ -288,72 +750,52 @@ def set_budget(username):
         print("⚠️  Start date cannot be after end date.")
         return
 
-    budgets[goal] = {
-        "progress": 0,
-        "start_date": start_date,
-        "end_date": end_date,
-        "username": username,
-    }
-
-    # Write budget data to CSV file
-    with open('budgets.csv', 'a', newline='') as csvfile:
-        fieldnames = ['goal', 'progress', 'start_date', 'end_date', 'username']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-
-        if csvfile.tell() == 0:
-            writer.writeheader()
-
-        writer.writerow({
-            'goal': goal,
-            'progress': 0,
-            'start_date': start_date,
-            'end_date': end_date,
-            'username': username,
-        })
+    create_budget(username, goal, start_date, end_date)
 
     print(f"✅ Budget for '{goal}' set from {start_date} to {end_date}.")
 
     add_budget = input("Do you want to add budget for this goal? (yes/no): ")
     if add_budget.lower() == "yes":
-        amount = float(input("Enter the amount to add to the budget: "))
+        amount = parse_amount(input("Enter the amount to add to the budget: "))
         if amount > user_balances.get(username, 0):
             print("⚠️  Insufficient balance to add to the budget.")
         else:
             user_balances[username] -= amount
-            budgets[goal]['progress'] += amount
-            print(f"✅ Budget for '{goal}' updated to ₱{budgets[goal]['progress']:.2f}. Remaining balance: ₱{user_balances[username]:.2f}")
+            budget = add_budget_progress(username, goal, amount)
+            print(f"✅ Budget for '{goal}' updated to ₱{budget['progress']:.2f}. Remaining balance: ₱{user_balances[username]:.2f}")
 
 
 def view_budgets(username):
     print("\n--- VIEW BUDGETS ---")
-    if not budgets:
+    user_budgets = get_user_budgets(username)
+    if not user_budgets:
         print("⚠️  No budgets set.")
         return
 
-    for goal, budget in budgets.items():
-        if budget['username'] == username:
-            print(f"Goal: {goal}")
-            print(f"Progress: ₱{budget['progress']:.2f}")
-            print(f"Start Date: {budget['start_date']}")
-            print(f"End Date: {budget['end_date']}")
-            print(f"Remaining Days: {(budget['end_date'] - datetime.date.today()).days}")
-            print()
+    for goal, budget in user_budgets.items():
+        print(f"Goal: {goal}")
+        print(f"Progress: ₱{budget['progress']:.2f}")
+        print(f"Start Date: {budget['start_date']}")
+        print(f"End Date: {budget['end_date']}")
+        print(f"Remaining Days: {(budget['end_date'] - datetime.date.today()).days}")
+        print()
 
 def financial_summary(username):
     print("\n--- FINANCIAL SUMMARY ---")
-    user_transactions = [t for t in transactions if t["username"] == username]
-    if not user_transactions:
+    if not get_user_transactions(username):
         print("📂 No transactions found.")
         return
 
-    # Calculate total income and expenses
-    total_income = sum(t["amount"] for t in user_transactions if t["type"] == "income")
-    total_expense = sum(t["amount"] for t in user_transactions if t["type"] == "expense")
-    net_balance = total_income - total_expense
+    if check_totals and not verify_totals(username):
+        print("⚠️  Running totals were out of sync and have been recomputed.")
+        user_totals[username] = compute_totals(username)
 
-    # Deduct budgets from net balance
-    total_budget = sum(b["progress"] for b in budgets.values() if b["username"] == username)
-    net_balance -= total_budget
+    # Totals are summed in cents and only turned into pesos here, for display
+    totals = get_user_summary(username)
+    total_income = totals["income"]
+    total_expense = totals["expense"]
+    total_budget = totals["budget"]
+    net_balance = totals["balance"]
 
     print(f"Total Income: ₱{total_income:.2f}")
     print(f"Total Expenses: ₱{total_expense:.2f}")
@@ -361,16 +803,11 @@ def financial_summary(username):
     print(f"Remaining Balance: ₱{net_balance:.2f}")
 
     print("\nCategory-wise Spending:")
-    for category in budgets:
-        if budgets[category]["username"] == username:
-            category_expense = sum(
-                t["amount"] for t in user_transactions if t["type"] == "expense" and t["category"] == category
-            )
-            category_budget = budgets[category]["progress"]
-            print(f"{category.capitalize()}: Budget = ₱{category_budget:.2f}")
+    for goal, budget in get_user_budgets(username).items():
+        print(f"{goal.capitalize()}: Budget = ₱{budget['progress']:.2f}")
 
 def main_menu():
-    load_users()
+    load_budgets()
     load_transactions()
     while True:
         print("\n===============================")
@@ -388,6 +825,8 @@ def main_menu():
             if username:
                 logged_in_menu(username)
         elif choice == "3":
+            if journal.records:
+                compact_transactions()
             print("👋 Thank you for using Penny Wise. Goodbye!\n\n")
             break
         else:
@@ -429,4 +868,6 @@ def logged_in_menu(username):
             print("⚠️  Invalid choice. Please try again.")
 
 if __name__ == "__main__":
+    if os.environ.get("PENNYWISE_DB"):
+        use_storage(SQLiteStorage(os.environ["PENNYWISE_DB"]))
     main_menu()
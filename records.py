@@ -0,0 +1,73 @@
+class Transaction:
+    """A compact transaction record that can be used like the old five-key dicts.
+
+    Fields are stored in __slots__ instead of a per-row dict, which cuts the
+    memory of every row by more than half while keeping t["amount"],
+    t["amount"] = value, t.get(...), t.update(...) and dict(t) working.
+    Modules without users leave username as None.
+    """
+
+    __slots__ = ("id", "username", "type", "amount", "category", "date")
+    FIELDS = __slots__
+
+    def __init__(self, id=None, username=None, type=None, amount=0.0, category=None, date=None):
+        self.id = id
+        self.username = username
+        self.type = type
+        self.amount = amount
+        self.category = category
+        self.date = date
+
+    def __getitem__(self, key):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def __iter__(self):
+        return iter(self.FIELDS)
+
+    def __len__(self):
+        return len(self.FIELDS)
+
+    def __eq__(self, other):
+        if isinstance(other, (Transaction, dict)):
+            return dict(self.items()) == dict(other.items())
+        return NotImplemented
+
+    __hash__ = None  # Mutable, like the dicts it replaces
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def keys(self):
+        return list(self.FIELDS)
+
+    def values(self):
+        return [getattr(self, field) for field in self.FIELDS]
+
+    def items(self):
+        return [(field, getattr(self, field)) for field in self.FIELDS]
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def update(self, other):
+        """Copy the fields of another transaction or dict into this one."""
+        for key, value in other.items():
+            self[key] = value
+
+    def copy(self):
+        return Transaction(*self.values())
+
+
+def transaction_sort_key(transaction):
+    """Order transactions by date, then by id."""
+    return (transaction["date"], transaction["id"])
@@ -0,0 +1,48 @@
+import calendar
+import datetime
+
+INTERVALS = ["daily", "weekly", "monthly", "yearly"]
+STEP_DAYS = {"daily": 1, "weekly": 7}
+STEP_MONTHS = {"monthly": 1, "yearly": 12}
+
+
+def add_months(start, months):
+    """Move a date by whole months, clamping the day to the end of shorter months."""
+    month_index = start.month - 1 + months
+    year = start.year + month_index // 12
+    month = month_index % 12 + 1
+    return datetime.date(year, month, min(start.day, calendar.monthrange(year, month)[1]))
+
+
+def nth_occurrence(start, interval, n):
+    """Return the date of occurrence n of a rule that starts on start (n=0 is start).
+
+    Months are counted from start, not from the previous occurrence, so a rule
+    that starts on Jan 31 falls on Feb 28 (or 29) and then on Mar 31 again.
+    """
+    if interval in STEP_DAYS:
+        return start + datetime.timedelta(days=n * STEP_DAYS[interval])
+    if interval in STEP_MONTHS:
+        return add_months(start, n * STEP_MONTHS[interval])
+    raise ValueError(f"Unknown interval '{interval}'.")
+
+
+def count_until(start, interval, until):
+    """Return how many occurrences fall on or before until, without walking them."""
+    if until < start:
+        return 0
+    if interval in STEP_DAYS:
+        return (until - start).days // STEP_DAYS[interval] + 1
+    if interval in STEP_MONTHS:
+        step = STEP_MONTHS[interval]
+        n = ((until.year - start.year) * 12 + until.month - start.month) // step
+        if add_months(start, n * step) > until:
+            n -= 1
+        return n + 1
+    raise ValueError(f"Unknown interval '{interval}'.")
+
+
+def occurrences(start, interval, until, first=0):
+    """Yield the dates of occurrences first, first + 1, ... that fall on or before until."""
+    for n in range(first, count_until(start, interval, until)):
+        yield nth_occurrence(start, interval, n)
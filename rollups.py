@@ -0,0 +1,67 @@
+from money import from_cents, to_cents
+
+
+class MonthlyRollups:
+    def __init__(self, source):
+        """Keep running totals per (year, month, category, type) bucket.
+
+        source(year, month) returns the transactions of one month and is only
+        used to rebuild the buckets of a month after invalidate(). Totals
+        are kept in integer cents and converted to pesos when read.
+        """
+        self.source = source
+        self.months = {}  # (year, month) -> {(category, type): [cents, count]}
+        self.dirty = set()  # Months to rebuild from source before the next read
+
+    def apply(self, transaction, sign):
+        """Add (sign=1) or take back (sign=-1) one transaction from its bucket."""
+        date = transaction["date"]
+        month = (date.year, date.month)
+        if month in self.dirty:
+            return  # The rebuild will count it
+        buckets = self.months.setdefault(month, {})
+        key = (transaction["category"], transaction["type"])
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = [0, 0]
+        bucket[0] += sign * to_cents(transaction["amount"])
+        bucket[1] += sign
+        if bucket[1] == 0:
+            del buckets[key]
+            if not buckets:
+                del self.months[month]
+
+    def add(self, transaction):
+        self.apply(transaction, 1)
+
+    def remove(self, transaction):
+        self.apply(transaction, -1)
+
+    def invalidate(self, year, month):
+        """Drop the buckets of one month; they are rebuilt from source on the next read."""
+        self.months.pop((year, month), None)
+        self.dirty.add((year, month))
+
+    def rebuild(self):
+        while self.dirty:
+            year, month = self.dirty.pop()
+            for transaction in self.source(year, month):
+                self.add(transaction)
+
+    def month_cents(self, year, month):
+        """Return {(category, type): cents} for one month."""
+        self.rebuild()
+        return {key: bucket[0] for key, bucket in self.months.get((year, month), {}).items()}
+
+    def month(self, year, month):
+        """Return {(category, type): total} for one month."""
+        return {key: from_cents(cents) for key, cents in self.month_cents(year, month).items()}
+
+    def totals_by_type(self):
+        """Return {type: total} over every month."""
+        self.rebuild()
+        totals = {}
+        for buckets in self.months.values():
+            for (_, transaction_type), bucket in buckets.items():
+                totals[transaction_type] = totals.get(transaction_type, 0) + bucket[0]
+        return {transaction_type: from_cents(total) for transaction_type, total in totals.items()}
@@ -0,0 +1,374 @@
+"""Serve the Penny Wise ledger to many users at once over TCP.
+
+Every request and response is one line of JSON:
+    {"op": "login", "username": "ana", "password": "secret"}
+    {"ok": true, "username": "ana"}
+
+Run from the repository root:
+    python service.py --port 8765
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import functools
+import json
+import os
+
+import batch
+import pennywise
+from journal import SYNC_MODES
+from money import parse_amount
+from storage import SQLiteStorage
+
+
+class PersistenceQueue:
+    def __init__(self):
+        """Run pennywise disk writes one at a time on a background thread.
+
+        Writes keep the order they were submitted in, so the journal on disk
+        always matches the order the changes were applied in memory.
+        """
+        self.queue = asyncio.Queue()
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.last = None  # Future of the most recent write
+        self.task = None
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    def submit(self, write):
+        """Queue a write and return the future of its result. Used as pennywise.background_writer."""
+        self.last = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((write, self.last))
+        return self.last
+
+    async def call(self, function, *args):
+        """Run other blocking disk I/O in turn with the writes and return its result."""
+        return await asyncio.shield(self.submit(functools.partial(function, *args)))
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            write, future = await self.queue.get()
+            try:
+                future.set_result(await loop.run_in_executor(self.executor, write))
+            except Exception as e:
+                future.set_exception(e)
+            self.queue.task_done()
+
+    async def wait(self):
+        """Wait until every write submitted so far is on disk."""
+        if self.last is not None:
+            await asyncio.shield(self.last)
+
+    async def close(self):
+        await self.queue.join()
+        if self.task is not None:
+            self.task.cancel()
+        self.executor.shutdown()
+
+
+def integer_field(request, name, default=None):
+    value = request.get(name, default)
+    # bool is an int subclass, but true is not a count or an id
+    if not isinstance(value, int) or isinstance(value, bool):
+        raise ValueError(f"{name.capitalize()} must be a whole number.")
+    return value
+
+
+def transaction_json(transaction):
+    return {
+        "id": transaction["id"],
+        "type": transaction["type"],
+        "amount": transaction["amount"],
+        "category": transaction["category"],
+        "date": str(transaction["date"]),
+    }
+
+
+class Session:
+    def __init__(self):
+        self.username = None
+
+
+class PennyWiseService:
+    def __init__(self):
+        """Handle requests against the shared in-memory pennywise ledger.
+
+        Requests run on one event loop, so each handler sees a consistent
+        ledger. A user's changes also hold that user's lock until they are
+        written, which keeps one user's requests in order while other users
+        carry on.
+        """
+        self.persistence = PersistenceQueue()
+        self.user_locks = {}
+        self.handlers = {
+            "register": self.register,
+            "login": self.login,
+            "logout": self.logout,
+            "add": self.add,
+            "view": self.view,
+            "update": self.update,
+            "delete": self.delete,
+            "set_budget": self.set_budget,
+            "add_budget": self.add_budget,
+            "budgets": self.budgets,
+            "summary": self.summary,
+        }
+        self.requests = 0
+        self.flusher = None
+
+    def lock_for(self, username):
+        if username not in self.user_locks:
+            self.user_locks[username] = asyncio.Lock()
+        return self.user_locks[username]
+
+    async def start(self, host="127.0.0.1", port=8765):
+        """Load the ledger and start listening. Returns the asyncio server."""
+        pennywise.load_budgets()
+        pennywise.load_transactions()
+        self.persistence.start()
+        pennywise.background_writer = self.persistence.submit
+        if pennywise.journal.flush_seconds:
+            self.flusher = asyncio.create_task(self.flush_periodically(pennywise.journal.flush_seconds))
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def flush_periodically(self, seconds):
+        """Write buffered journal records that have waited long enough, even if no change comes in."""
+        while True:
+            await asyncio.sleep(seconds)
+            if pennywise.journal.flush_due():
+                pennywise.flush()
+
+    async def stop(self):
+        """Fold the journal into the snapshot and finish every pending write."""
+        if self.flusher is not None:
+            self.flusher.cancel()
+        pennywise.compact_transactions()
+        await self.persistence.close()
+        pennywise.background_writer = None
+
+    async def handle_client(self, reader, writer):
+        session = Session()
+        try:
+            while line := await reader.readline():
+                response = await self.handle_line(session, line)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def handle_line(self, session, line):
+        """Run one JSON request and return the response dict."""
+        self.requests += 1
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError:
+            return {"ok": False, "error": "Request is not valid JSON."}
+        if not isinstance(request, dict) or request.get("op") not in self.handlers:
+            return {"ok": False, "error": "Unknown operation."}
+        handler = self.handlers[request["op"]]
+        if handler not in [self.register, self.login] and session.username is None:
+            return {"ok": False, "error": "Log in first."}
+        try:
+            result = await handler(session, request)
+        except ValueError as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, **result}
+
+    async def user_call(self, function, *args):
+        """Run a user store lookup or append without blocking the event loop.
+
+        SQLite storage stays on the loop, like its transaction writes.
+        """
+        if pennywise.storage is not None:
+            return function(*args)
+        return await self.persistence.call(function, *args)
+
+    async def changed(self):
+        """Wait for the writes of the change just made.
+
+        Changes that the journal is still buffering for a group commit are
+        acknowledged before they reach the disk.
+        """
+        await self.persistence.wait()
+
+    async def register(self, session, request):
+        username = batch.text_field(request, "username")
+        password = batch.text_field(request, "password")
+        if not username:
+            raise ValueError("Missing username.")
+        async with self.lock_for(username):
+            if await self.user_call(pennywise.find_user, username) is not None:
+                raise ValueError("User already exists.")
+            await self.user_call(pennywise.add_user, username, password)
+        return {"username": username}
+
+    async def login(self, session, request):
+        username = batch.text_field(request, "username")
+        password = await self.user_call(pennywise.find_user, username)
+        if password is None:
+            raise ValueError("User does not exist.")
+        if password != batch.text_field(request, "password"):
+            raise ValueError("Incorrect password.")
+        session.username = username
+        pennywise.logged_in_users[username] = True
+        return {"username": username}
+
+    async def logout(self, session, request):
+        pennywise.flush()
+        await self.changed()
+        pennywise.logged_in_users.pop(session.username, None)
+        session.username = None
+        return {}
+
+    async def add(self, session, request):
+        row = batch.validate_row(request, session.username, check_users=False)
+        if row[0] != session.username:
+            raise ValueError("You can only add your own transactions.")
+        async with self.lock_for(session.username):
+            transaction = pennywise.create_transaction(*row)
+            await self.changed()
+        return {"transaction": transaction_json(transaction)}
+
+    async def view(self, session, request):
+        limit = integer_field(request, "limit", 5)
+        if limit < 1:
+            raise ValueError("Limit must be a whole number.")
+        before = request.get("before")
+        if before is not None:
+            if not (isinstance(before, list) and len(before) == 2 and isinstance(before[0], str)
+                    and isinstance(before[1], int)):
+                raise ValueError("Before must be a [date, id] pair.")
+            try:
+                before = (pennywise.parse_date(before[0]), before[1])
+            except ValueError:
+                raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+        page = pennywise.recent_transactions(session.username, limit, before)
+        return {"transactions": [transaction_json(t) for t in page]}
+
+    def own_transaction(self, session, request):
+        pennywise.get_user_transactions(session.username)
+        # Ids are stable across compactions, so an id handed out earlier still names the same row
+        transaction = pennywise.transactions_by_id.get(integer_field(request, "id"))
+        if transaction is None or transaction["username"] != session.username:
+            raise ValueError("Transaction not found.")
+        return transaction
+
+    async def update(self, session, request):
+        field = request.get("field")
+        value = request.get("value")
+        if field == "type":
+            value = batch.text_field(request, "value").lower()
+            if value not in ["income", "expense"]:
+                raise ValueError("Type must be 'income' or 'expense'.")
+        elif field == "amount":
+            try:
+                value = parse_amount(value)
+            except (TypeError, ValueError):
+                raise ValueError("Amount must be a number.")
+            if not value > 0:
+                raise ValueError("Amount must be a positive number.")
+        elif field == "category":
+            value = batch.text_field(request, "value") or "Uncategorized"
+        elif field == "date":
+            try:
+                value = pennywise.parse_date(batch.text_field(request, "value"))
+            except ValueError:
+                raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+        else:
+            raise ValueError("Field must be type, amount, category or date.")
+        async with self.lock_for(session.username):
+            transaction = self.own_transaction(session, request)
+            pennywise.modify_transaction(transaction, field, value)
+            await self.changed()
+        return {"transaction": transaction_json(transaction)}
+
+    async def delete(self, session, request):
+        async with self.lock_for(session.username):
+            transaction = self.own_transaction(session, request)
+            pennywise.remove_transaction(transaction)
+            await self.changed()
+        return {"id": transaction["id"]}
+
+    async def set_budget(self, session, request):
+        goal = batch.text_field(request, "goal")
+        if not goal:
+            raise ValueError("Missing goal.")
+        try:
+            start_date = pennywise.parse_date(batch.text_field(request, "start_date"))
+            end_date = pennywise.parse_date(batch.text_field(request, "end_date"))
+        except ValueError:
+            raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+        async with self.lock_for(session.username):
+            pennywise.create_budget(session.username, goal, start_date, end_date)
+            await self.changed()
+        return {"goal": goal}
+
+    async def add_budget(self, session, request):
+        goal = batch.text_field(request, "goal")
+        try:
+            amount = parse_amount(request.get("amount"))
+        except (TypeError, ValueError):
+            raise ValueError("Amount must be a number.")
+        async with self.lock_for(session.username):
+            if goal not in pennywise.get_user_budgets(session.username):
+                raise ValueError("Budget goal not found.")
+            budget = pennywise.add_budget_progress(session.username, goal, amount)
+            await self.changed()
+        return {"goal": goal, "progress": budget["progress"]}
+
+    async def budgets(self, session, request):
+        return {"budgets": {
+            goal: {
+                "progress": budget["progress"],
+                "start_date": str(budget["start_date"]),
+                "end_date": str(budget["end_date"]),
+            }
+            for goal, budget in pennywise.get_user_budgets(session.username).items()
+        }}
+
+    async def summary(self, session, request):
+        pennywise.get_user_transactions(session.username)
+        return pennywise.get_user_summary(session.username)
+
+
+async def serve(host, port):
+    service = PennyWiseService()
+    server = await service.start(host, port)
+    print(f"✅ Penny Wise service listening on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Penny Wise ledger over TCP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--sqlite", metavar="DB", default=os.environ.get("PENNYWISE_DB"),
+                        help="Use this SQLite database instead of the CSV files")
+    parser.add_argument("--flush-records", type=int, default=1,
+                        help="Write the journal once this many changes are buffered")
+    parser.add_argument("--flush-seconds", type=float,
+                        help="Also write buffered changes once the oldest has waited this long")
+    parser.add_argument("--sync", choices=SYNC_MODES, default="none",
+                        help="When to fsync the journal: never, once per write, or after every change")
+    args = parser.parse_args()
+    pennywise.journal.flush_records = args.flush_records
+    pennywise.journal.flush_seconds = args.flush_seconds
+    pennywise.journal.sync = args.sync
+    if args.sqlite:
+        pennywise.use_storage(SQLiteStorage(args.sqlite))
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Service stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,34 @@
+"""Track budgets and transactions per category from a menu.
+
+The script shares dateindex, ledger, money and records with the rest of the
+repository, so run it as a module from the repository root:
+    python -m setBudget.setBudget
+"""
 import datetime
+import sys
+
+if __name__ == "__main__" and not __package__:
+    # Started as python setBudget/setBudget.py, where the shared modules cannot be imported
+    sys.exit("Run setBudget from the repository root with: python -m setBudget.setBudget")
+
+from dateindex import DateIndex
+from ledger import SpentLedger
+from money import parse_amount
+from records import Transaction
 
 # List for the transactions
 transactions = []
 
+# The same transactions, ordered by date for month and range queries
+date_index = DateIndex()
+next_transaction_id = 1
+
 # Dictionary for budgets
 budgets = {}
 
+# Spent per category, updated on every add, update and delete (and kept in budgets)
+spent_ledger = SpentLedger(budgets)
+
 CATEGORIES = ["food", "entertainment", "transport", "salary", "miscellaneous"]
 
 def print_boxed(text_lines):
@@ -17,6 +40,7 @@ def print_boxed(text_lines):
     print("+" + "-" * (max_len + 2) + "+")
 
 def add_transaction():
+    global next_transaction_id
     print_boxed(["Add a Transaction"])
     t_type = input("Enter type (income/expense): ").strip().lower()
     if t_type not in ['income', 'expense']:
@@ -24,7 +48,7 @@ def add_transaction():
         return
 
     try:
-        amount = float(input("Enter amount: ").strip())
+        amount = parse_amount(input("Enter amount: ").strip())
         if amount <= 0:
             print("Amount must be a positive number.")
             return
@@ -45,17 +69,13 @@ def add_transaction():
         return
 
     # Store the transaction
-    transaction = {
-        "type": t_type,
-        "amount": amount,
-        "category": category,
-        "date": date
-    }
+    transaction = Transaction(id=next_transaction_id, type=t_type, amount=amount, category=category, date=date)
+    next_transaction_id += 1
     transactions.append(transaction)
+    date_index.add(transaction)
 
     # Deduct from the budget if expense
-    if t_type == "expense" and category in budgets:
-        budgets[category]["spent"] += amount
+    spent_ledger.add(transaction)
 
     print("Transaction added successfully!")
 
@@ -81,10 +101,7 @@ def view_transactions_by_month():
         print("Invalid format. Use MM-YYYY.")
         return
 
-    filtered_transactions = [
-        t for t in transactions
-        if t['date'].month == month_year.month and t['date'].year == month_year.year
-    ]
+    filtered_transactions = date_index.month(month_year.year, month_year.month)
 
     if not filtered_transactions:
         print_boxed([f"No transactions found for {month_year.strftime('%B %Y')}."])
@@ -96,6 +113,14 @@ def view_transactions_by_month():
         lines.append(f"{idx}. {transaction['type'].capitalize()} - {transaction['amount']} ({transaction['category']}) on {transaction['date']}")
     print_boxed(lines)
 
+def transactions_between(start, end):
+    """Return the transactions dated from start to end (inclusive), oldest first."""
+    return date_index.between(start, end)
+
+def transactions_in_last_days(days):
+    """Return the transactions from the last N days (e.g. 90), oldest first."""
+    return date_index.last_days(days)
+
 def update_transaction():
     if not transactions:
         print_boxed(["No transactions to update."])
@@ -114,21 +139,23 @@ def update_transaction():
     transaction = transactions[transaction_index]
 
     print("Leave fields blank to keep the current value.")
+    changes = {}
 
     t_type = input(f"Enter type (income/expense) [{transaction['type']}]: ").strip().lower()
     if t_type and t_type not in ['income', 'expense']:
         print("Invalid type. Must be 'income' or 'expense'.")
         return
-    transaction['type'] = t_type if t_type else transaction['type']
+    if t_type:
+        changes['type'] = t_type
 
     amount_input = input(f"Enter amount [{transaction['amount']}]: ").strip()
     if amount_input:
         try:
-            amount = float(amount_input)
+            amount = parse_amount(amount_input)
             if amount <= 0:
                 print("Amount must be a positive number.")
                 return
-            transaction['amount'] = amount
+            changes['amount'] = amount
         except ValueError:
             print("Invalid amount. Please enter a number.")
             return
@@ -137,19 +164,31 @@ def update_transaction():
     if category and category not in CATEGORIES:
         print(f"Invalid category. Must be one of {CATEGORIES}.")
         return
-    transaction['category'] = category if category else transaction['category']
+    if category:
+        changes['category'] = category
 
     date_input = input(f"Enter date (YYYY-MM-DD) [{transaction['date']}]: ").strip()
     if date_input:
         try:
-            date = datetime.datetime.strptime(date_input, "%Y-%m-%d").date()
-            transaction['date'] = date
+            changes['date'] = datetime.datetime.strptime(date_input, "%Y-%m-%d").date()
         except ValueError:
             print("Invalid date format. Use YYYY-MM-DD.")
             return
 
+    # Nothing changes until every answer is valid
+    change_transaction(transaction, changes)
     print("Transaction updated successfully!")
 
+def change_transaction(transaction, changes):
+    """Apply {field: value} changes to a transaction, keeping the index and spent totals in step."""
+    spent_ledger.remove(transaction)
+    if "date" in changes:
+        date_index.remove(transaction)
+    transaction.update(changes)
+    if "date" in changes:
+        date_index.add(transaction)
+    spent_ledger.add(transaction)
+
 def delete_transaction():
     if not transactions:
         print_boxed(["No transactions to delete."])
@@ -170,6 +209,8 @@ def delete_transaction():
     confirm = input(f"Are you sure you want to delete this transaction? (yes/no): ").strip().lower()
     if confirm == "yes":
         del transactions[transaction_index]
+        date_index.remove(transaction)
+        spent_ledger.remove(transaction)
         print("Transaction deleted successfully!")
     else:
         print("Transaction not deleted.")
@@ -183,7 +224,7 @@ def set_budget():
         return
 
     try:
-        limit = float(input("Enter budget limit: ").strip())
+        limit = parse_amount(input("Enter budget limit: ").strip())
         if limit <= 0:
             print("Budget must be a positive number.")
             return
@@ -191,7 +232,7 @@ def set_budget():
         print("Invalid budget. Please enter a number.")
         return
 
-    budgets[category] = {"limit": limit, "spent": 0}
+    budgets[category] = {"limit": limit, "spent": spent_ledger.spent_in(category)}
     print(f"Budget set for {category}: {limit}")
 
 def view_budget_status():
@@ -0,0 +1,216 @@
+import csv
+import datetime
+import os
+import sqlite3
+import sys
+
+from journal import TransactionJournal
+from money import parse_amount
+from records import Transaction
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    username TEXT NOT NULL,
+    type TEXT NOT NULL,
+    amount REAL NOT NULL,
+    category TEXT NOT NULL,
+    date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_user_date ON transactions (username, date);
+CREATE INDEX IF NOT EXISTS transactions_user_category ON transactions (username, category);
+CREATE TABLE IF NOT EXISTS budgets (
+    username TEXT NOT NULL,
+    goal TEXT NOT NULL,
+    progress REAL NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    PRIMARY KEY (username, goal)
+);
+"""
+
+# Statements are kept as constants so sqlite3 reuses its prepared statements
+INSERT_USER = "INSERT INTO users (username, password) VALUES (?, ?)"
+SELECT_USER = "SELECT password FROM users WHERE username = ?"
+INSERT_TRANSACTION = (
+    "INSERT INTO transactions (id, username, type, amount, category, date) VALUES (?, ?, ?, ?, ?, ?)"
+)
+UPDATE_TRANSACTION = "UPDATE transactions SET type = ?, amount = ?, category = ?, date = ? WHERE id = ?"
+DELETE_TRANSACTION = "DELETE FROM transactions WHERE id = ?"
+SELECT_USER_TRANSACTIONS = (
+    "SELECT id, username, type, amount, category, date FROM transactions WHERE username = ? ORDER BY date, id"
+)
+SELECT_MAX_TRANSACTION_ID = "SELECT COALESCE(MAX(id), 0) FROM transactions"
+UPSERT_BUDGET = (
+    "INSERT OR REPLACE INTO budgets (username, goal, progress, start_date, end_date) VALUES (?, ?, ?, ?, ?)"
+)
+SELECT_BUDGETS = "SELECT username, goal, progress, start_date, end_date FROM budgets"
+
+
+def parse_date(value):
+    """Convert a YYYY-MM-DD string to a date."""
+    return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+
+
+class SQLiteStorage:
+    def __init__(self, path):
+        """Open (and create if needed) the SQLite database at path."""
+        self.path = path
+        self.connection = sqlite3.connect(path, cached_statements=32)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        """Close the database connection."""
+        self.connection.close()
+
+    def get_user(self, username):
+        """Return the password of one user, or None if the user does not exist."""
+        row = self.connection.execute(SELECT_USER, (username,)).fetchone()
+        return row[0] if row else None
+
+    def add_user(self, username, password):
+        """Store a new user."""
+        with self.connection:
+            self.connection.execute(INSERT_USER, (username, password))
+
+    def next_transaction_id(self):
+        """Return the id the next new transaction should get."""
+        return self.connection.execute(SELECT_MAX_TRANSACTION_ID).fetchone()[0] + 1
+
+    def load_user_transactions(self, username):
+        """Return the transactions of one user, oldest first."""
+        return [
+            Transaction(row[0], row[1], row[2], row[3], row[4], parse_date(row[5]))
+            for row in self.connection.execute(SELECT_USER_TRANSACTIONS, (username,))
+        ]
+
+    def record(self, op, transaction):
+        """Persist a single add/update/delete of a transaction."""
+        self.record_many(op, [transaction])
+
+    def record_many(self, op, transactions):
+        """Persist the same operation for many transactions in one database transaction."""
+        if op == "add":
+            statement = INSERT_TRANSACTION
+            rows = [(t["id"], t["username"], t["type"], t["amount"], t["category"], str(t["date"]))
+                    for t in transactions]
+        elif op == "update":
+            statement = UPDATE_TRANSACTION
+            rows = [(t["type"], t["amount"], t["category"], str(t["date"]), t["id"]) for t in transactions]
+        elif op == "delete":
+            statement = DELETE_TRANSACTION
+            rows = [(t["id"],) for t in transactions]
+        else:
+            raise ValueError(f"Unknown operation '{op}'.")
+        with self.connection:
+            self.connection.executemany(statement, rows)
+
+    def load_budgets(self):
+        """Return every budget goal."""
+        return [
+            {
+                "username": row[0],
+                "goal": row[1],
+                "progress": row[2],
+                "start_date": parse_date(row[3]),
+                "end_date": parse_date(row[4]),
+            }
+            for row in self.connection.execute(SELECT_BUDGETS)
+        ]
+
+    def save_budget(self, username, goal, budget):
+        """Insert or replace the budget goal of a user."""
+        with self.connection:
+            self.connection.execute(UPSERT_BUDGET, (
+                username, goal, budget["progress"], str(budget["start_date"]), str(budget["end_date"]),
+            ))
+
+
+def read_csv_ledger(transactions_file, journal_file):
+    """Return {id: [username, type, amount, category, date]} with the journal replayed on the snapshot.
+
+    Ids are read from the snapshot, or numbered by position for snapshots
+    written before ids were stored, as pennywise.load_transactions() does. The
+    files are only read: a checkpoint interrupted after its commit point is
+    read from the new snapshot instead of being finished.
+    """
+    journal = TransactionJournal(journal_file)
+    offset, checkpointed = journal.recover()
+    snapshot = transactions_file
+    if checkpointed and os.path.exists(transactions_file + ".tmp"):
+        snapshot = transactions_file + ".tmp"
+    rows = {}
+    try:
+        with open(snapshot, "r", newline="") as f:
+            for position, row in enumerate(csv.DictReader(f), start=1):
+                rows[int(row.get("id") or position)] = [row["username"], row["type"], row["amount"], row["category"], row["date"]]
+    except FileNotFoundError:
+        pass
+    for op, transaction_id, row in journal.replay(offset):
+        if op == "delete":
+            del rows[transaction_id]
+        else:
+            rows[transaction_id] = row
+    return rows
+
+
+def migrate_from_csv(db_path, users_file="users.csv", transactions_file="transactions.csv",
+                     budgets_file="budgets.csv", journal_file="transactions.journal"):
+    """Copy the CSV files and the journal not yet folded into them into a new SQLite database.
+
+    Returns the row counts.
+    """
+    storage = SQLiteStorage(db_path)
+    counts = {"users": 0, "transactions": 0, "budgets": 0}
+    try:
+        with storage.connection:
+            try:
+                with open(users_file, "r") as f:
+                    for row in csv.DictReader(f):
+                        storage.connection.execute(
+                            "INSERT OR REPLACE INTO users (username, password) VALUES (?, ?)",
+                            (row["username"], row["password"]),
+                        )
+                        counts["users"] += 1
+            except FileNotFoundError:
+                pass
+
+            for transaction_id, (username, transaction_type, amount, category, date) in read_csv_ledger(
+                    transactions_file, journal_file).items():
+                storage.connection.execute(INSERT_TRANSACTION, (
+                    transaction_id, username, transaction_type, float(amount), category, date,
+                ))
+                counts["transactions"] += 1
+
+            try:
+                with open(budgets_file, "r", newline="") as f:
+                    for row in csv.DictReader(f):
+                        try:
+                            budget = (row["username"], row["goal"], parse_amount(row["progress"]),
+                                      str(parse_date(row["start_date"])), str(parse_date(row["end_date"])))
+                        except (TypeError, ValueError):
+                            continue  # Cut short by an interrupted append, as pennywise.load_budgets() skips it
+                        storage.connection.execute(UPSERT_BUDGET, budget)
+                        counts["budgets"] += 1
+            except FileNotFoundError:
+                pass
+    finally:
+        storage.close()
+    return counts
+
+
+def main():
+    db_path = sys.argv[1] if len(sys.argv) > 1 else "pennywise.db"
+    counts = migrate_from_csv(db_path)
+    print(f"✅ Migrated {counts['users']} users, {counts['transactions']} transactions "
+          f"and {counts['budgets']} budgets into '{db_path}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import datetime
+import json
+
+import batch
+import pennywise
+
+
+def test_import_csv_validates_and_writes_once(ledger, reload_ledger, monkeypatch):
+    monkeypatch.setattr(pennywise, "users", {"kim": "urge"})
+    path = ledger / "export.csv"
+    path.write_text(
+        "username,type,amount,category,date\n"
+        "kim,income,1000,,2024-12-09\n"
+        "kim,expense,-5,Food,2024-12-09\n"
+        "nobody,expense,5,Food,2024-12-09\n"
+        "kim,expense,200.5,Food,12/09/2024\n"
+        ",Expense,20,Food,2024-12-10\n"
+    )
+    report = batch.import_transactions(str(path), default_username="kim")
+    assert report["accepted"] == 2
+    assert [r["line"] for r in report["rejected"]] == [3, 4, 5]
+    assert pennywise.journal.records == 2
+
+    loaded = reload_ledger()
+    assert [(t["type"], t["amount"], t["category"]) for t in loaded] == [
+        ("income", 1000.0, "Income"),
+        ("expense", 20.0, "Food"),
+    ]
+
+
+def test_import_jsonl(ledger, monkeypatch):
+    monkeypatch.setattr(pennywise, "users", {"kim": "urge"})
+    path = ledger / "export.jsonl"
+    path.write_text(
+        json.dumps({"username": "kim", "type": "expense", "amount": 12.5, "category": "Food", "date": "2024-12-01"})
+        + "\nnot json\n"
+    )
+    report = batch.import_transactions(str(path))
+    assert report["accepted"] == 1
+    assert report["rejected"] == [{"line": 2, "reason": "Row is not a valid record."}]
+    assert pennywise.get_user_transactions("kim")[0]["date"] == datetime.date(2024, 12, 1)
+
+
+def test_import_jsonl_rejects_fields_of_the_wrong_type(ledger, monkeypatch):
+    monkeypatch.setattr(pennywise, "users", {"kim": "urge"})
+    good = {"username": "kim", "type": "expense", "amount": 12.5, "category": "Food", "date": "2024-12-01"}
+    rows = [
+        {**good, "username": 5},
+        {**good, "amount": None},
+        {**good, "type": ["expense"]},
+        {**good, "date": 20241201},
+        {**good, "amount": "1e400"},
+        {**good, "username": None, "category": None},
+    ]
+    path = ledger / "export.jsonl"
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows))
+    report = batch.import_transactions(str(path), default_username="kim")
+    assert report["accepted"] == 1
+    assert report["rejected"] == [
+        {"line": 1, "reason": "Username must be text."},
+        {"line": 2, "reason": "Amount must be a number."},
+        {"line": 3, "reason": "Type must be text."},
+        {"line": 4, "reason": "Date must be text."},
+        {"line": 5, "reason": "Amount must be a number."},
+    ]
+    assert pennywise.get_user_transactions("kim")[0]["category"] == "Uncategorized"
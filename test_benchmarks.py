@@ -0,0 +1,21 @@
+import pennywise
+from benchmarks import generator
+from benchmarks.suite import BENCHMARKS, run_suite
+
+
+def test_generator_is_seeded():
+    first = list(generator.generate_transactions(50, seed=7))
+    assert first == list(generator.generate_transactions(50, seed=7))
+    assert first != list(generator.generate_transactions(50, seed=8))
+
+
+def test_suite_runs_every_benchmark(ledger, monkeypatch):
+    # The suite repoints pennywise's files; restore them after the test
+    for name in ["transactions_file", "transactions_cache_file", "journal", "journal_compact_threshold",
+                 "users_file", "users_index_file", "user_store", "users", "budgets_file", "budgets"]:
+        monkeypatch.setattr(pennywise, name, getattr(pennywise, name))
+
+    results = run_suite(200, repeat=1)
+    assert set(BENCHMARKS) <= set(results["results"])
+    assert "pennywise.load_transactions_warm" in results["results"]
+    assert all(r["seconds"] >= 0 for r in results["results"].values())
@@ -0,0 +1,97 @@
+import datetime
+
+import pytest
+
+import pennywise
+from benchmarks import generator
+from binledger import BinaryLedger, csv_to_ledger, ledger_to_csv, write_ledger
+from records import Transaction
+
+
+def test_csv_round_trip_is_exact(ledger, reload_ledger):
+    pennywise.add_transactions(list(generator.generate_transactions(500, users=20, seed=4)))
+    pennywise.compact_transactions()
+    original = (ledger / "transactions.csv").read_text()
+
+    assert csv_to_ledger(str(ledger / "transactions.csv"), str(ledger / "transactions.ledger")) == 500
+    assert ledger_to_csv(str(ledger / "transactions.ledger"), str(ledger / "copy.csv")) == 500
+    assert (ledger / "copy.csv").read_text() == original
+
+
+def test_conversions_respect_the_journal(ledger, reload_ledger):
+    date = datetime.date(2024, 12, 9)
+    for amount in (1.0, 2.0, 3.0):
+        pennywise.create_transaction("kim", "income", amount, "Income", date)
+    pennywise.compact_transactions()
+    pennywise.remove_transaction(pennywise.transactions_by_id[1])
+    pennywise.create_transaction("kim", "expense", 4.0, "Food", date)
+
+    csv_path = str(ledger / "transactions.csv")
+    ledger_path = str(ledger / "transactions.ledger")
+    assert csv_to_ledger(csv_path, ledger_path) == 3
+    with BinaryLedger(ledger_path) as binary:
+        rows = [binary.row(index) for index in range(len(binary))]
+    assert [(t["id"], t["amount"]) for t in rows] == [(2, 2.0), (3, 3.0), (4, 4.0)]
+
+    # Replacing the snapshot under uncompacted changes would replay them on top
+    original = (ledger / "transactions.csv").read_text()
+    with pytest.raises(ValueError):
+        ledger_to_csv(ledger_path, csv_path)
+    assert (ledger / "transactions.csv").read_text() == original
+
+    pennywise.compact_transactions()
+    assert ledger_to_csv(ledger_path, csv_path) == 3
+    assert not (ledger / "transactions.csv.tmp").exists()
+    assert [(t["id"], t["amount"]) for t in reload_ledger()] == [(2, 2.0), (3, 3.0), (4, 4.0)]
+
+
+def test_queries_read_the_mapped_columns(tmp_path, backend):
+    rows = list(generator.generate_transactions(1000, users=10, seed=2))
+    path = str(tmp_path / "transactions.ledger")
+    write_ledger(path, rows)
+
+    with BinaryLedger(path) as ledger:
+        assert len(ledger) == 1000
+        assert list(ledger.rows()) == rows
+        assert ledger.row(0) == Transaction(1, *rows[0])
+        with pytest.raises(IndexError):
+            ledger.row(1000)
+
+        kim = [row for row in rows if row[0] == "user3"]
+        assert [(t["type"], t["amount"], t["date"]) for t in ledger.transactions("user3")] == [
+            (row[1], row[2], row[4]) for row in kim
+        ]
+        assert ledger.transactions("nobody") == []
+
+        by_type, by_category = ledger.totals("user3")
+        assert by_type == {
+            kind: sum(round(row[2] * 100) for row in kim if row[1] == kind) for kind in ["expense", "income"]
+        }
+        expected = {}
+        for _, kind, amount, category, _ in kim:
+            if kind == "expense":
+                expected[category] = expected.get(category, 0) + round(amount * 100)
+        assert by_category == expected
+        assert sum(ledger.totals()[0].values()) == sum(round(row[2] * 100) for row in rows)
+
+
+def test_empty_and_foreign_files(tmp_path):
+    path = str(tmp_path / "empty.ledger")
+    assert write_ledger(path, []) == 0
+    with BinaryLedger(path) as ledger:
+        assert len(ledger) == 0
+        assert list(ledger.rows()) == []
+        assert ledger.totals() == ({}, {})
+
+    (tmp_path / "other.ledger").write_bytes(b"not a ledger at all, just text")
+    (tmp_path / "short.ledger").write_bytes(b"PW")
+    for name in ["other.ledger", "short.ledger"]:
+        with pytest.raises(ValueError):
+            BinaryLedger(str(tmp_path / name))
+
+
+def test_dates_survive_the_ordinal_column(tmp_path):
+    path = str(tmp_path / "dates.ledger")
+    write_ledger(path, [("kim", "expense", 1.5, "Food", datetime.date(1999, 12, 31))])
+    with BinaryLedger(path) as ledger:
+        assert ledger.row(0)["date"] == datetime.date(1999, 12, 31)
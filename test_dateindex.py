@@ -0,0 +1,37 @@
+import datetime
+
+from dateindex import DateIndex
+from financial import BudgetManager
+from records import Transaction
+
+
+def test_month_and_range_queries():
+    index = DateIndex()
+    dates = [datetime.date(2024, 11, 30), datetime.date(2024, 12, 1), datetime.date(2024, 12, 31),
+             datetime.date(2025, 1, 1), datetime.date(2024, 12, 15)]
+    rows = [Transaction(id=i, type="expense", amount=1.0, category="food", date=d) for i, d in enumerate(dates)]
+    for row in rows:
+        index.add(row)
+
+    assert [t["id"] for t in index.month(2024, 12)] == [1, 4, 2]
+    assert [t["id"] for t in index.between(datetime.date(2024, 12, 2), datetime.date(2025, 1, 1))] == [4, 2, 3]
+    assert [t["id"] for t in index.last_days(2, today=datetime.date(2025, 1, 1))] == [2, 3]
+
+    index.remove(rows[4])
+    rows[4]["date"] = datetime.date(2025, 1, 20)
+    index.add(rows[4])
+    assert [t["id"] for t in index.month(2025, 1)] == [3, 4]
+
+
+def test_budget_manager_month_view_uses_index(monkeypatch, capsys):
+    manager = BudgetManager()
+    answers = iter(["expense", "20", "food", "2024-12-03", "income", "500", "salary", "2024-11-28", "12-2024"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    manager.add_transaction()
+    manager.add_transaction()
+    manager.view_transactions_by_month()
+
+    output = capsys.readouterr().out
+    assert "Transactions for December 2024:" in output
+    assert "salary" not in output.split("December 2024")[1]
+    assert len(manager.transactions_between(datetime.date(2024, 11, 1), datetime.date(2024, 12, 31))) == 2
@@ -0,0 +1,52 @@
+import csv
+import datetime
+import gzip
+import json
+
+from export import export_rows
+from records import Transaction
+from transactionAddView import RecurringTransactionManager
+
+
+def ledger_rows(count):
+    for i in range(count):
+        yield Transaction(i + 1, ["kim", "ana"][i % 2], "expense", float(i), "Food",
+                          datetime.date(2024, 1, 1) + datetime.timedelta(days=i))
+
+
+def test_export_csv_from_a_generator_in_chunks(tmp_path):
+    path = str(tmp_path / "out.csv")
+    assert export_rows(ledger_rows(25), path, chunk_size=4) == 25
+    with open(path, newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ["Date", "Type", "Category", "Amount"]
+    assert rows[1] == ["2024-01-01", "expense", "Food", "0.00"]
+    assert len(rows) == 26
+
+
+def test_jsonl_amounts_match_csv(tmp_path):
+    rows = [Transaction(1, "kim", "expense", 0.1 + 0.2, "Food", datetime.date(2024, 1, 1))]
+    export_rows(rows, str(tmp_path / "out.csv"))
+    export_rows(rows, str(tmp_path / "out.jsonl"))
+    with open(tmp_path / "out.csv", newline="") as f:
+        amount = list(csv.reader(f))[1][3]
+    assert amount == json.loads((tmp_path / "out.jsonl").read_text())["amount"] == "0.30"
+
+
+def test_export_gzipped_jsonl_with_filters(tmp_path):
+    path = str(tmp_path / "out.jsonl.gz")
+    count = export_rows(ledger_rows(100), path, start=datetime.date(2024, 1, 10),
+                        end=datetime.date(2024, 1, 20), username="kim")
+    with gzip.open(path, "rt") as f:
+        rows = [json.loads(line) for line in f]
+    assert count == len(rows) == 5
+    assert rows[0] == {"date": "2024-01-11", "type": "expense", "category": "Food", "amount": "10.00"}
+
+
+def test_manager_export_no_longer_targets_the_ledger(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = RecurringTransactionManager()
+    manager.transactions = list(ledger_rows(3))
+    manager.export_transactions()
+    assert (tmp_path / "recurring_transactions.csv").exists()
+    assert not (tmp_path / "transactions.csv").exists()
@@ -0,0 +1,203 @@
+import datetime
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import pytest
+
+import journal
+import pennywise
+from journal import TransactionJournal
+
+
+pytestmark = pytest.mark.usefixtures("ledger")
+
+
+def test_changes_are_appended_and_replayed(reload_ledger):
+    date = datetime.date(2024, 12, 9)
+    income = pennywise.create_transaction("kim", "income", 1000.0, "Income", date)
+    food = pennywise.create_transaction("kim", "expense", 50.0, "Food", date)
+    pennywise.modify_transaction(food, "amount", 75.0)
+    pennywise.remove_transaction(income)
+    assert pennywise.journal.records == 4
+
+    loaded = reload_ledger()
+    assert len(loaded) == 1
+    assert loaded[0]["amount"] == 75.0
+    assert loaded[0]["id"] == food["id"]
+
+
+def test_compaction_folds_journal_into_snapshot(ledger, reload_ledger):
+    date = datetime.date(2024, 12, 9)
+    for amount in (100.0, 200.0, 300.0):
+        pennywise.create_transaction("kim", "income", amount, "Income", date)
+    pennywise.remove_transaction(pennywise.transactions_by_id[1])
+
+    pennywise.compact_transactions()
+    assert (ledger / "transactions.journal").read_text().splitlines() == ["next_id,4"]
+    assert list(pennywise.transactions_by_id) == [2, 3]
+
+    pennywise.modify_transaction(pennywise.transactions_by_id[3], "amount", 350.0)
+    loaded = reload_ledger()
+    assert [(t["id"], t["amount"]) for t in loaded] == [(2, 200.0), (3, 350.0)]
+
+
+def test_ids_survive_compaction_after_a_delete(reload_ledger):
+    date = datetime.date(2024, 12, 9)
+    first = pennywise.create_transaction("kim", "income", 1.0, "Income", date)
+    second = pennywise.create_transaction("kim", "income", 2.0, "Income", date)
+    last = pennywise.create_transaction("kim", "income", 3.0, "Income", date)
+    pennywise.remove_transaction(first)
+    pennywise.remove_transaction(last)
+    pennywise.compact_transactions()
+    assert second["id"] == 2
+    assert pennywise.create_transaction("kim", "income", 4.0, "Income", date)["id"] == 4
+
+    # The ids and the next id come back from the snapshot and the journal
+    pennywise.compact_transactions()
+    assert [(t["id"], t["amount"]) for t in reload_ledger()] == [(2, 2.0), (4, 4.0)]
+    assert pennywise.create_transaction("kim", "income", 5.0, "Income", date)["id"] == 5
+
+
+def test_snapshot_without_ids_is_numbered_by_position(ledger, reload_ledger):
+    (ledger / "transactions.csv").write_text(
+        "username,type,amount,category,date\n"
+        "kim,income,1.00,Income,2024-12-09\n"
+        "kim,income,2.00,Income,2024-12-09\n"
+    )
+    (ledger / "transactions.journal").write_text("delete,1,kim,income,1.00,Income,2024-12-09\n")
+    assert [(t["id"], t["amount"]) for t in reload_ledger()] == [(2, 2.0)]
+
+
+def test_compaction_triggers_at_threshold(reload_ledger, monkeypatch):
+    monkeypatch.setattr(pennywise, "journal_compact_threshold", 3)
+    date = datetime.date(2024, 12, 9)
+    for amount in (100.0, 200.0, 300.0):
+        pennywise.create_transaction("kim", "income", amount, "Income", date)
+    assert pennywise.journal.records == 0
+    assert len(reload_ledger()) == 3
+
+
+def test_group_commit_by_record_count(ledger, reload_ledger, monkeypatch):
+    monkeypatch.setattr(pennywise.journal, "flush_records", 3)
+    date = datetime.date(2024, 12, 9)
+    for amount in (100.0, 200.0):
+        pennywise.create_transaction("kim", "income", amount, "Income", date)
+    assert not (ledger / "transactions.journal").exists()
+
+    pennywise.create_transaction("kim", "income", 300.0, "Income", date)
+    assert len(pennywise.journal.pending) == 0
+    assert len((ledger / "transactions.journal").read_text().splitlines()) == 3
+
+
+def test_group_commit_by_interval_and_logout(ledger, monkeypatch):
+    monkeypatch.setattr(pennywise.journal, "flush_records", 100)
+    monkeypatch.setattr(pennywise.journal, "flush_seconds", 5.0)
+    clock = [1000.0]
+    monkeypatch.setattr(journal.time, "monotonic", lambda: clock[0])
+    date = datetime.date(2024, 12, 9)
+    pennywise.create_transaction("kim", "income", 100.0, "Income", date)
+    clock[0] += 6.0
+    pennywise.create_transaction("kim", "income", 200.0, "Income", date)
+    assert len((ledger / "transactions.journal").read_text().splitlines()) == 2
+
+    pennywise.create_transaction("kim", "income", 300.0, "Income", date)
+    assert len(pennywise.journal.pending) == 1
+    pennywise.logout("kim")
+    assert len((ledger / "transactions.journal").read_text().splitlines()) == 3
+
+
+def test_sync_modes(ledger, monkeypatch):
+    synced = []
+    monkeypatch.setattr(journal.os, "fsync", synced.append)
+    monkeypatch.setattr(pennywise.journal, "sync", "commit")
+    monkeypatch.setattr(pennywise.journal, "flush_records", 100)
+    date = datetime.date(2024, 12, 9)
+    pennywise.create_transaction("kim", "income", 100.0, "Income", date)
+    assert len(synced) == 1
+
+    monkeypatch.setattr(pennywise.journal, "sync", "batch")
+    pennywise.add_transactions([("kim", "income", 1.0, "Income", date)] * 3)
+    pennywise.flush()
+    assert len(synced) == 2
+    with pytest.raises(ValueError):
+        TransactionJournal(str(ledger / "other.journal"), sync="always")
+
+
+def test_torn_last_record_is_cut_off(ledger, reload_ledger):
+    date = datetime.date(2024, 12, 9)
+    for amount in (100.0, 200.0):
+        pennywise.create_transaction("kim", "income", amount, "Income", date)
+    with open(ledger / "transactions.journal", "a") as f:
+        f.write("add,3,kim,inc")
+
+    assert [t["amount"] for t in reload_ledger()] == [100.0, 200.0]
+    pennywise.create_transaction("kim", "income", 300.0, "Income", date)
+    assert [t["amount"] for t in reload_ledger()] == [100.0, 200.0, 300.0]
+
+
+@pytest.mark.parametrize("marked", [False, True])
+def test_interrupted_checkpoint_is_recovered(ledger, reload_ledger, marked):
+    date = datetime.date(2024, 12, 9)
+    for amount in (100.0, 200.0, 300.0):
+        pennywise.create_transaction("kim", "income", amount, "Income", date)
+    pennywise.compact_transactions()
+    pennywise.remove_transaction(pennywise.transactions_by_id[1])
+    pennywise.create_transaction("kim", "income", 400.0, "Income", date)
+
+    # Crash after the new snapshot was written, before (or just after) the checkpoint record
+    pennywise.write_snapshot(pennywise.snapshot_rows())
+    if marked:
+        pennywise.journal.mark_checkpoint()
+
+    assert [t["amount"] for t in reload_ledger()] == [200.0, 300.0, 400.0]
+    assert not (ledger / "transactions.csv.tmp").exists()
+    assert pennywise.last_load_stats["journal_records"] == (0 if marked else 2)
+
+
+def test_stale_checkpoint_does_not_commit_a_later_snapshot(ledger, reload_ledger):
+    date = datetime.date(2024, 12, 9)
+    for amount in (1.0, 2.0, 3.0):
+        pennywise.create_transaction("kim", "income", amount, "Income", date)
+    # First crash: after the swap, before the journal was cleared
+    pennywise.write_snapshot(pennywise.snapshot_rows())
+    pennywise.journal.mark_checkpoint()
+    os.replace(ledger / "transactions.csv.tmp", ledger / "transactions.csv")
+    pennywise.remove_transaction(pennywise.transactions_by_id[1])
+    pennywise.create_transaction("kim", "income", 4.0, "Income", date)
+    # Second crash: the next snapshot is written but never marked
+    pennywise.write_snapshot(pennywise.snapshot_rows())
+
+    assert [t["amount"] for t in reload_ledger()] == [2.0, 3.0, 4.0]
+    assert not (ledger / "transactions.csv.tmp").exists()
+
+
+def test_recovery_after_kill_mid_write(ledger, reload_ledger):
+    # A writer that checkpoints every 50 records is killed at an arbitrary point
+    writer = subprocess.Popen([sys.executable, "-c", textwrap.dedent(f"""
+        import datetime, itertools, pennywise
+        from journal import TransactionJournal
+        pennywise.transactions_file = {str(ledger / "transactions.csv")!r}
+        pennywise.transactions_cache_file = {str(ledger / "transactions.cache")!r}
+        pennywise.journal = TransactionJournal({str(ledger / "transactions.journal")!r})
+        pennywise.journal_compact_threshold = 50
+        for amount in itertools.count(1):
+            pennywise.create_transaction("kim", "income", float(amount), "Income", datetime.date(2024, 12, 9))
+    """)], cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        deadline = time.monotonic() + 10
+        while not (ledger / "transactions.csv").exists() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.2)
+    finally:
+        writer.kill()
+        writer.wait()
+
+    amounts = [t["amount"] for t in reload_ledger()]
+    # Every change before the kill survives, in order, and nothing else
+    assert len(amounts) >= 50
+    assert amounts == [float(amount) for amount in range(1, len(amounts) + 1)]
+    # Recovery replays at most one checkpoint interval of the journal
+    assert pennywise.last_load_stats["journal_records"] <= 50
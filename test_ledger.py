@@ -0,0 +1,106 @@
+import datetime
+import os
+import subprocess
+import sys
+
+import part2
+from benchmarks.verify_ledger import verify_ledger
+from financial import BudgetManager
+from ledger import SpentLedger, group_totals
+from records import Transaction
+from setBudget import setBudget
+
+
+def expense(i, amount, category):
+    return Transaction(id=i, type="expense", amount=amount, category=category, date=datetime.date(2024, 12, i))
+
+
+def test_spent_follows_updates_and_deletes(monkeypatch):
+    manager = BudgetManager()
+    manager.budgets["food"] = {"limit": 100.0, "spent": 0.0}
+    manager.store_many([expense(1, 20.0, "food"), expense(2, 30.0, "food"), expense(3, 5.0, "transport")])
+    assert manager.budgets["food"]["spent"] == 50.0
+
+    manager.change(manager.transactions[1], {"amount": 40.0})
+    manager.change(manager.transactions[2], {"category": "food"})
+    assert manager.budgets["food"]["spent"] == 65.0
+    manager.change(manager.transactions[0], {"type": "income"})
+    manager.remove_at(1)
+    assert manager.budgets["food"]["spent"] == 5.0
+    assert manager.spent_ledger.verify(manager.transactions) == []
+
+    # A budget set later starts from what was already spent
+    answers = iter(["transport", "50"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    manager.set_budget()
+    assert manager.budgets["transport"]["spent"] == 0.0
+
+    manager.budgets["food"]["spent"] = 0.0
+    assert manager.spent_ledger.verify(manager.transactions) == ["food"]
+
+
+def test_set_budget_runs_as_a_module_only():
+    root = os.path.dirname(os.path.abspath(__file__))
+    module = subprocess.run([sys.executable, "-m", "setBudget.setBudget"], cwd=root, input="8\n",
+                            capture_output=True, text=True)
+    assert module.returncode == 0 and "Goodbye!" in module.stdout
+    script = subprocess.run([sys.executable, os.path.join("setBudget", "setBudget.py")], cwd=root,
+                            capture_output=True, text=True)
+    assert script.returncode == 1
+    assert script.stderr.strip() == "Run setBudget from the repository root with: python -m setBudget.setBudget"
+
+
+def test_set_budget_module_keeps_spent_in_step(monkeypatch):
+    budgets = {"food": {"limit": 100.0, "spent": 0.0}}
+    monkeypatch.setattr(setBudget, "transactions", [])
+    monkeypatch.setattr(setBudget, "date_index", setBudget.DateIndex())
+    monkeypatch.setattr(setBudget, "budgets", budgets)
+    monkeypatch.setattr(setBudget, "spent_ledger", SpentLedger(budgets))
+    answers = iter([
+        "expense", "20", "food", "2024-12-01",
+        "1", "", "25", "", "",
+        "1", "yes",
+    ])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    setBudget.add_transaction()
+    setBudget.update_transaction()
+    assert budgets["food"]["spent"] == 25.0
+    setBudget.delete_transaction()
+    assert budgets["food"]["spent"] == 0.0
+
+
+def test_verification_on_a_synthetic_ledger():
+    report = verify_ledger(2000, 2000, seed=3)
+    assert report["wrong"] == []
+
+
+def test_part2_budget_status_uses_counters(monkeypatch, capsys):
+    manager = part2.BudgetManager()
+    manager.budgets = {"food": 100.0, "rent": 500.0}
+    answers = iter(["food", "20", "food", "5.5", "rent", "450", "food"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    for _ in range(3):
+        manager.add_transaction()
+    assert manager.spent.spent == {"food": 25.5, "rent": 450.0}
+    manager.get_budget_status()
+    assert "Spent: 25.5\nRemaining: 74.5" in capsys.readouterr().out
+
+    # A delete plus an add keeps the count but not the totals
+    manager.remove(manager.transactions[0])
+    manager.store({"category": "rent", "amount": 100.0})
+    manager.view_all_budgets()
+    out = capsys.readouterr().out
+    assert "Spent: 5.5\nRemaining: 94.5" in out
+    assert "Spent: 550.0\nRemaining: -50.0" in out
+
+    # Rows changed directly are picked up by the one-pass group-by once invalidated
+    manager.transactions[0]["amount"] = 10.0
+    manager.spent.invalidate()
+    manager.view_all_budgets()
+    assert "Spent: 10.0\nRemaining: 90.0" in capsys.readouterr().out
+
+
+def test_group_totals():
+    rows = [expense(1, 2.0, "food"), expense(2, 3.0, "rent"), expense(3, 4.0, "food")]
+    assert group_totals(rows) == {"food": 6.0, "rent": 3.0}
+    assert group_totals(rows, key="id", where=lambda t: t["category"] == "food") == {1: 2.0, 3: 4.0}
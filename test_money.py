@@ -0,0 +1,60 @@
+import array
+import csv
+import datetime
+
+import pytest
+
+import pennywise
+from money import cents_array, format_cents, parse_amount, parse_cents, sum_cents, sum_cents_by_code, to_cents
+
+
+def test_parse_and_format():
+    assert parse_cents("12.5") == 1250
+    assert parse_cents(" 1,234.56 ") == 123456
+    assert parse_cents("0.005") == 1  # Half a cent rounds up
+    assert parse_cents(7) == 700
+    assert parse_amount("19.99") == 19.99
+    assert parse_cents("90000000000000") == 9000000000000000
+    assert format_cents(-1205) == "-12.05"
+    assert format_cents(5) == "0.05"
+    for text in ["abc", "", "nan", "inf", None, "1e400", "-1e400", "1e999999999", "100000000000000"]:
+        with pytest.raises(ValueError):
+            parse_cents(text)
+        with pytest.raises(ValueError):
+            parse_amount(text)
+
+
+def test_text_round_trips_exactly():
+    for cents in range(-1000, 100000, 7):
+        assert parse_cents(format_cents(cents)) == cents
+        assert to_cents(float(format_cents(cents))) == cents
+
+
+def test_vectorized_sums_are_exact(backend):
+    cents = cents_array([0.1] * 10 + [0.2] * 5)
+    assert sum_cents(cents) == 200
+    codes = array.array("q", [0] * 10 + [2] * 5)
+    assert sum_cents_by_code(codes, cents, 3) == [100, 0, 100]
+    assert sum_cents_by_code(array.array("q"), array.array("q"), 2) == [0, 0]
+
+
+def test_ledger_totals_do_not_drift(ledger, reload_ledger):
+    date = datetime.date(2024, 12, 1)
+    pennywise.add_transactions([("kim", "expense", 0.1, "Food", date)] * 1000)
+    pennywise.create_transaction("kim", "income", 100.0, "Income", date)
+    assert pennywise.get_user_summary("kim")["balance"] == 0.0
+
+    pennywise.compact_transactions()
+    with open(ledger / "transactions.csv", newline="") as f:
+        assert {row["amount"] for row in csv.DictReader(f)} == {"0.10", "100.00"}
+    reload_ledger()
+    assert pennywise.get_user_totals("kim")["expense"] == 10000
+    assert pennywise.verify_totals("kim")
+
+
+def test_menus_reject_huge_amounts(ledger, monkeypatch, capsys):
+    answers = iter(["expense", "1e400"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    pennywise.add_transaction("kim")
+    assert "Amount must be a positive number." in capsys.readouterr().out
+    assert pennywise.transactions_by_id == {}
@@ -1,5 +1,8 @@
 import pytest
 import datetime
+import os
+
+import pennywise
 
 # Core data structures for the budget tracker
 @pytest.fixture(autouse=True)
@@ -149,4 +152,141 @@ def test_update_transaction():
     }
     update_transaction(transactions, 0, updated_transaction)
     assert len(transactions) == 1
-    assert transactions[0] == updated_transaction
\ No newline at end of file
+    assert transactions[0] == updated_transaction
+
+def test_user_transaction_index(ledger, reload_ledger):
+    date = datetime.date.today()
+    kim_income = pennywise.create_transaction("kim", "income", 1000.0, "Income", date)
+    pennywise.create_transaction("lala", "income", 500.0, "Income", date)
+    kim_food = pennywise.create_transaction("kim", "expense", 50.0, "Food", date)
+    assert pennywise.get_user_transactions("kim") == [kim_income, kim_food]
+
+    pennywise.remove_transaction(kim_income)
+    assert pennywise.get_user_transactions("kim") == [kim_food]
+    assert pennywise.get_user_transactions("nobody") == []
+
+    reload_ledger()
+    assert [t["amount"] for t in pennywise.get_user_transactions("kim")] == [50.0]
+    assert [t["amount"] for t in pennywise.get_user_transactions("lala")] == [500.0]
+
+
+def test_running_totals(ledger, reload_ledger):
+    date = datetime.date.today()
+    pennywise.create_transaction("kim", "income", 1000.0, "Income", date)
+    food = pennywise.create_transaction("kim", "expense", 200.0, "Food", date)
+    fare = pennywise.create_transaction("kim", "expense", 30.0, "Transport", date)
+    pennywise.modify_transaction(food, "category", "Leisure")
+    pennywise.remove_transaction(fare)
+
+    totals = pennywise.get_user_totals("kim")
+    assert totals["income"] == 100000
+    assert totals["expense"] == 20000
+    assert totals["categories"] == {"Food": 0, "Leisure": 20000, "Transport": 0}
+    assert pennywise.get_user_summary("kim")["balance"] == 800.0
+    assert pennywise.verify_totals("kim")
+
+    totals["expense"] += 1
+    assert not pennywise.verify_totals("kim")
+
+    reload_ledger()
+    assert pennywise.get_user_totals("kim")["expense"] == 20000
+    assert pennywise.verify_totals("kim")
+
+
+def test_load_transactions_uses_snapshot_cache(ledger, reload_ledger):
+    csv_path = ledger / "transactions.csv"
+    csv_path.write_text(
+        "username,type,amount,category,date\n"
+        "kim,income,1000.0,Income,2024-12-09\n"
+        "lala,expense,200.0,Leisure,2024-12-09\n"
+    )
+    cold = reload_ledger()
+    assert pennywise.last_load_stats["source"] == "csv"
+    assert cold[0]["date"] is cold[1]["date"]
+
+    warm = reload_ledger()
+    assert pennywise.last_load_stats["source"] == "cache"
+    assert warm == cold
+
+    csv_path.write_text("username,type,amount,category,date\nkim,income,5.0,Income,2024-12-10\n")
+    assert [t["amount"] for t in reload_ledger()] == [5.0]
+    assert pennywise.last_load_stats["source"] == "csv"
+
+    # Same size and modification time, different contents
+    stat = csv_path.stat()
+    csv_path.write_text("username,type,amount,category,date\nkim,income,7.0,Income,2024-12-10\n")
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert [t["amount"] for t in reload_ledger()] == [7.0]
+    assert not (ledger / "transactions.cache.tmp").exists()
+
+
+def test_recent_transactions_pages_with_cursor(ledger, reload_ledger):
+    for day in [5, 1, 9, 3, 7, 9]:
+        pennywise.create_transaction("kim", "income", float(day), "Income", datetime.date(2024, 12, day))
+    pennywise.create_transaction("lala", "income", 1.0, "Income", datetime.date(2024, 12, 31))
+
+    first = pennywise.recent_transactions("kim", 3)
+    assert [(t["date"].day, t["id"]) for t in first] == [(9, 6), (9, 3), (7, 5)]
+    second = pennywise.recent_transactions("kim", 3, before=pennywise.transaction_sort_key(first[-1]))
+    assert [t["date"].day for t in second] == [5, 3, 1]
+    assert pennywise.recent_transactions("kim", 3, before=pennywise.transaction_sort_key(second[-1])) == []
+
+    pennywise.modify_transaction(second[-1], "date", datetime.date(2024, 12, 30))
+    assert pennywise.recent_transactions("kim", 1)[0]["amount"] == 1.0
+
+    reload_ledger()
+    assert [t["date"].day for t in pennywise.recent_transactions("kim", 10)] == [30, 9, 9, 7, 5, 3]
+
+
+def test_budget_goals_are_per_user_and_updated_in_place(ledger, monkeypatch):
+    (ledger / "budgets.csv").write_text(
+        "goal,progress,start_date,end_date,username\n"
+        "ipad,0,2024-12-03,2025-07-13,kim\n"
+        "ipad,50,2024-12-15,2025-06-01,kim\n"
+        "ipad,10,2024-12-01,2025-06-01,lala\n"
+    )
+    pennywise.load_budgets()
+    assert pennywise.get_user_budgets("kim")["ipad"]["progress"] == 50.0
+    assert pennywise.get_user_budgets("lala")["ipad"]["progress"] == 10.0
+    assert pennywise.get_user_totals("kim")["budget"] == 5000
+
+    pennywise.add_budget_progress("kim", "ipad", 25.0)
+    pennywise.create_budget("lala", "bike", datetime.date(2025, 1, 1), datetime.date(2025, 6, 1))
+    assert pennywise.get_user_totals("kim")["budget"] == 7500
+    assert pennywise.verify_totals("kim")
+
+    # Each change appended one row
+    assert (ledger / "budgets.csv").read_text().splitlines()[4:] == [
+        "ipad,75.00,2024-12-15,2025-06-01,kim",
+        "bike,0.00,2025-01-01,2025-06-01,lala",
+    ]
+    monkeypatch.setattr(pennywise, "budgets", {})
+    pennywise.load_budgets()
+    assert pennywise.get_user_budgets("kim")["ipad"]["progress"] == 75.0
+    assert pennywise.get_user_budgets("lala")["bike"]["progress"] == 0.0
+
+    # Replaced rows outgrowing the live goals rewrite the file
+    for _ in range(2):
+        pennywise.add_budget_progress("lala", "bike", 1.0)
+    assert sorted((ledger / "budgets.csv").read_text().splitlines()[1:]) == [
+        "bike,2.00,2025-01-01,2025-06-01,lala",
+        "ipad,10.00,2024-12-01,2025-06-01,lala",
+        "ipad,75.00,2024-12-15,2025-06-01,kim",
+    ]
+
+
+def test_torn_budget_rows_are_skipped(ledger, monkeypatch):
+    # Two interrupted appends: one cut inside the start date, the last inside the progress
+    (ledger / "budgets.csv").write_text(
+        "goal,progress,start_date,end_date,username\n"
+        "bike,1.00,2025-01-01,2025-06-01,kim\n"
+        "bike,125.00,2025-0\n"
+        "bike,12"
+    )
+    pennywise.load_budgets()
+    assert pennywise.get_user_budgets("kim")["bike"]["progress"] == 1.0
+
+    pennywise.add_budget_progress("kim", "bike", 1.0)
+    monkeypatch.setattr(pennywise, "budgets", {})
+    pennywise.load_budgets()
+    assert pennywise.get_user_budgets("kim")["bike"]["progress"] == 2.0
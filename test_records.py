@@ -0,0 +1,24 @@
+import datetime
+
+import pytest
+
+from records import Transaction
+
+
+def test_transaction_behaves_like_a_dict():
+    date = datetime.date(2024, 12, 9)
+    transaction = Transaction(1, "kim", "expense", 50.0, "Food", date)
+    as_dict = {"id": 1, "username": "kim", "type": "expense", "amount": 50.0, "category": "Food", "date": date}
+
+    assert transaction == as_dict
+    assert dict(transaction) == as_dict
+    assert transaction["category"] == "Food"
+    assert transaction.get("missing", "default") == "default"
+
+    transaction["amount"] = 75.0
+    transaction.update({"category": "Leisure"})
+    assert (transaction.amount, transaction.category) == (75.0, "Leisure")
+
+    with pytest.raises(KeyError):
+        transaction["notes"] = "lunch"
+    assert not hasattr(transaction, "__dict__")
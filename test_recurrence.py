@@ -0,0 +1,132 @@
+import datetime
+import threading
+import time
+
+import pytest
+
+from recurrence import INTERVALS, add_months, count_until, nth_occurrence, occurrences
+from transactionAddView import RecurringTransactionManager
+
+
+def test_month_end_is_clamped_from_the_start_date():
+    start = datetime.date(2024, 1, 31)
+    assert [nth_occurrence(start, "monthly", n) for n in range(4)] == [
+        datetime.date(2024, 1, 31),
+        datetime.date(2024, 2, 29),
+        datetime.date(2024, 3, 31),
+        datetime.date(2024, 4, 30),
+    ]
+    assert nth_occurrence(datetime.date(2024, 2, 29), "yearly", 1) == datetime.date(2025, 2, 28)
+    assert add_months(datetime.date(2024, 11, 30), 3) == datetime.date(2025, 2, 28)
+
+
+@pytest.mark.parametrize("interval", INTERVALS)
+def test_count_matches_walking_the_occurrences(interval):
+    start = datetime.date(2020, 1, 31)
+    for until in [start - datetime.timedelta(days=1), start, datetime.date(2020, 2, 29),
+                  datetime.date(2021, 1, 30), datetime.date(2024, 12, 31)]:
+        walked = 0
+        while nth_occurrence(start, interval, walked) <= until:
+            walked += 1
+        assert count_until(start, interval, until) == walked
+    assert list(occurrences(start, "monthly", datetime.date(2020, 4, 15), first=1)) == [
+        datetime.date(2020, 2, 29), datetime.date(2020, 3, 31),
+    ]
+
+
+def test_manager_catches_up_and_resumes():
+    manager = RecurringTransactionManager()
+    manager.recurring_transactions.append({
+        "type": "expense", "category": "Rent", "amount": 500.0,
+        "interval": "monthly", "next_due": datetime.date(2021, 1, 31),
+    })
+    manager.process_recurring_transactions(today=datetime.date(2024, 1, 15))
+    assert len(manager.transactions) == 36
+    assert manager.transactions[1]["date"] == datetime.date(2021, 2, 28)
+    assert manager.recurring_transactions[0]["next_due"] == datetime.date(2024, 1, 31)
+
+    manager.process_recurring_transactions(today=datetime.date(2024, 2, 29))
+    assert [t["date"] for t in manager.transactions[36:]] == [datetime.date(2024, 1, 31), datetime.date(2024, 2, 29)]
+
+    # Stopping a generator early leaves the rest due
+    rule = manager.recurring_transactions[0]
+    due = manager.due_transactions(rule, datetime.date(2024, 12, 31))
+    next(due)
+    due.close()
+    assert rule["next_due"] == datetime.date(2024, 4, 30)
+
+
+def rule(category, interval, next_due):
+    return {"type": "expense", "category": category, "amount": 10.0, "interval": interval, "next_due": next_due}
+
+
+def test_scheduler_pops_only_due_rules(monkeypatch):
+    manager = RecurringTransactionManager()
+    manager.recurring_transactions = [rule(f"later{i}", "yearly", datetime.date(2030, 1, 1)) for i in range(100)]
+    manager.recurring_transactions.append(rule("now", "weekly", datetime.date(2024, 1, 1)))
+    expanded = []
+    due_transactions = manager.due_transactions
+    monkeypatch.setattr(manager, "due_transactions", lambda r, until: expanded.append(r) or due_transactions(r, until))
+
+    assert len(manager.run_due(datetime.date(2024, 1, 15))) == 3
+    assert [r["category"] for r in expanded] == ["now"]
+    assert manager.next_due() == datetime.date(2024, 1, 22)
+
+
+def test_rules_survive_a_restart(tmp_path):
+    path = str(tmp_path / "recurring_rules.csv")
+    manager = RecurringTransactionManager(path)
+    manager.recurring_transactions.append(rule("Rent", "monthly", datetime.date(2024, 1, 31)))
+    manager.run_due(datetime.date(2024, 3, 1))
+
+    restarted = RecurringTransactionManager(path)
+    assert restarted.recurring_transactions == manager.recurring_transactions
+    assert [t["date"] for t in restarted.run_due(datetime.date(2024, 4, 30))] == [
+        datetime.date(2024, 3, 31), datetime.date(2024, 4, 30),
+    ]
+
+
+def test_generated_transactions_survive_a_crash(tmp_path, monkeypatch):
+    path = str(tmp_path / "recurring_rules.csv")
+    manager = RecurringTransactionManager(path)
+    manager.recurring_transactions.append(rule("Rent", "monthly", datetime.date(2024, 1, 31)))
+    manager.run_due(datetime.date(2024, 3, 1))
+    # Crash after the transactions were appended, before the rule progress was saved
+    monkeypatch.setattr(manager, "save_rules", lambda: None)
+    manager.run_due(datetime.date(2024, 4, 30))
+    with open(tmp_path / "recurring_rules_processed.csv", "a") as f:
+        f.write("1,9,2024-10-31,exp")  # Torn append
+
+    restarted = RecurringTransactionManager(path)
+    assert [t["date"] for t in restarted.transactions] == [
+        datetime.date(2024, 1, 31), datetime.date(2024, 2, 29), datetime.date(2024, 3, 31), datetime.date(2024, 4, 30),
+    ]
+    assert restarted.run_due(datetime.date(2024, 4, 30)) == []
+    assert [t["date"] for t in restarted.run_due(datetime.date(2024, 5, 31))] == [datetime.date(2024, 5, 31)]
+    assert len(RecurringTransactionManager(path).transactions) == 5
+
+
+def test_removed_rules_leave_the_schedule():
+    manager = RecurringTransactionManager()
+    manager.recurring_transactions = [rule("Gym", "weekly", datetime.date(2024, 1, 1)),
+                                      rule("Rent", "monthly", datetime.date(2024, 1, 31))]
+    assert manager.next_due() == datetime.date(2024, 1, 1)
+    del manager.recurring_transactions[0]
+    manager.recurring_transactions.append(rule("Phone", "monthly", datetime.date(2024, 1, 15)))
+    assert manager.next_due() == datetime.date(2024, 1, 15)
+    assert [t["category"] for t in manager.run_due(datetime.date(2024, 1, 31))] == ["Phone", "Rent"]
+
+
+def test_run_scheduler_until_stopped(capsys):
+    manager = RecurringTransactionManager()
+    manager.recurring_transactions.append(rule("Gym", "daily", datetime.date.today()))
+    stop = threading.Event()
+    scheduler = threading.Thread(target=manager.run_scheduler, args=(stop, 0.01))
+    scheduler.start()
+    deadline = time.monotonic() + 5
+    while not manager.transactions and time.monotonic() < deadline:
+        time.sleep(0.01)
+    stop.set()
+    scheduler.join()
+    assert [t["date"] for t in manager.transactions] == [datetime.date.today()]
+    assert "Gym" in capsys.readouterr().out
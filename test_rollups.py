@@ -0,0 +1,65 @@
+import datetime
+
+from financial import BudgetManager
+from records import Transaction
+
+
+def expense(i, amount, category, date, t_type="expense"):
+    return Transaction(id=i, type=t_type, amount=amount, category=category, date=date)
+
+
+def test_rollups_follow_every_change(monkeypatch):
+    manager = BudgetManager()
+    rows = [
+        expense(1, 20.0, "food", datetime.date(2024, 12, 3)),
+        expense(2, 5.0, "food", datetime.date(2024, 12, 20)),
+        expense(3, 500.0, "salary", datetime.date(2024, 11, 28), "income"),
+    ]
+    for row in rows:
+        manager.store(row)
+    assert manager.rollups.month(2024, 12) == {("food", "expense"): 25.0}
+    assert manager.calculate_financial_summary()[:2] == (500.0, 25.0)
+
+    manager.change(rows[1], {"date": datetime.date(2024, 11, 2), "category": "transport", "amount": 7.5})
+    assert manager.rollups.month(2024, 12) == {("food", "expense"): 20.0}
+    assert manager.rollups.month(2024, 11) == {("salary", "income"): 500.0, ("transport", "expense"): 7.5}
+
+    answers = iter(["1", "yes"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    manager.delete_transaction()
+    assert manager.rollups.month(2024, 12) == {}
+    assert manager.calculate_financial_summary()[:2] == (500.0, 7.5)
+    assert "  Transport (expense): 7.5" in manager.month_report(2024, 11)
+
+
+def test_invalid_update_changes_nothing(monkeypatch):
+    manager = BudgetManager()
+    row = expense(1, 20.0, "food", datetime.date(2024, 12, 3))
+    manager.store(row)
+    answers = iter(["1", "income", "-3"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    manager.update_transaction()
+    assert row["type"] == "expense"
+    assert manager.rollups.totals_by_type() == {"expense": 20.0}
+
+
+def test_invalidated_month_is_rebuilt_from_the_index():
+    manager = BudgetManager()
+    for i in range(1, 11):
+        manager.store(expense(i, 0.1, "food", datetime.date(2024, 12, i)))
+    manager.rollups.months[(2024, 12)][("food", "expense")][0] = 99900  # Corrupt the bucket
+
+    manager.rollups.invalidate(2024, 12)
+    # Changes made while the month waits for its rebuild are counted once
+    manager.store(expense(11, 0.1, "food", datetime.date(2024, 12, 11)))
+    assert manager.rollups.month(2024, 12) == {("food", "expense"): 1.1}
+
+
+def test_month_report_sums_cents():
+    manager = BudgetManager()
+    categories = ["food", "transport", "entertainment"]
+    for i, category in enumerate(categories, start=1):
+        manager.store(expense(i, 0.1, category, datetime.date(2024, 12, 1)))
+    assert manager.rollups.month_cents(2024, 12)[("food", "expense")] == 10
+    # 0.1 + 0.1 + 0.1 would print 0.30000000000000004
+    assert "Total Expenses: 0.3" in manager.month_report(2024, 12)
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import threading
+
+import pennywise
+from service import PennyWiseService
+
+
+async def talk(port, requests):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    responses = []
+    for fields in requests:
+        writer.write(json.dumps(fields).encode() + b"\n")
+        await writer.drain()
+        responses.append(json.loads(await reader.readline()))
+    writer.close()
+    await writer.wait_closed()
+    return responses
+
+
+def run_service(ledger, *clients):
+    """Start a service, run each client's requests concurrently and stop it."""
+    async def run():
+        service = PennyWiseService()
+        server = await service.start("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        try:
+            return await asyncio.gather(*(talk(port, requests) for requests in clients))
+        finally:
+            server.close()
+            await server.wait_closed()
+            await service.stop()
+            pennywise.get_user_store().close()
+    return asyncio.run(run())
+
+
+def test_service_handles_users_concurrently(ledger, reload_ledger, monkeypatch):
+    monkeypatch.setattr(pennywise, "logged_in_users", {})
+    sessions = [
+        [
+            {"op": "add", "type": "income", "amount": 10},
+            {"op": "register", "username": name, "password": "pw"},
+            {"op": "login", "username": name, "password": "pw"},
+            {"op": "add", "type": "income", "amount": 1000, "category": "Salary", "date": "2024-12-01"},
+            {"op": "add", "type": "expense", "amount": 200, "category": "Food", "date": "2024-12-02"},
+            {"op": "add", "type": "expense", "amount": 50, "category": "Food", "date": "2024-12-03"},
+            {"op": "view", "limit": 2},
+            {"op": "summary"},
+        ]
+        for name in ["kim", "ana"]
+    ]
+    for responses in run_service(ledger, *sessions):
+        assert responses[0] == {"ok": False, "error": "Log in first."}
+        assert all(r["ok"] for r in responses[1:])
+        assert [t["amount"] for t in responses[6]["transactions"]] == [50.0, 200.0]
+        assert responses[7]["balance"] == 750.0
+        assert responses[7]["categories"] == {"Food": 250.0}
+
+    # The service compacts on exit, so everything is in the snapshot
+    assert [line.split(",")[0] for line in (ledger / "transactions.journal").read_text().splitlines()] == ["next_id"]
+    loaded = reload_ledger()
+    assert sorted(t["username"] for t in loaded) == ["ana"] * 3 + ["kim"] * 3
+
+
+def test_service_changes_only_own_transactions(ledger, monkeypatch):
+    monkeypatch.setattr(pennywise, "logged_in_users", {})
+    kim, ana = run_service(ledger, [
+        {"op": "register", "username": "kim", "password": "pw"},
+        {"op": "login", "username": "kim", "password": "pw"},
+        {"op": "add", "type": "expense", "amount": 20, "category": "Food", "date": "2024-12-01"},
+        {"op": "update", "id": 1, "field": "amount", "value": 25},
+        {"op": "update", "id": 1, "field": "amount", "value": -1},
+        {"op": "set_budget", "goal": "trip", "start_date": "2024-12-01", "end_date": "2025-01-01"},
+        {"op": "add_budget", "goal": "trip", "amount": 100},
+        {"op": "budgets"},
+        {"op": "delete", "id": 1},
+        {"op": "view"},
+    ], [
+        {"op": "register", "username": "ana", "password": "pw"},
+        {"op": "login", "username": "ana", "password": "wrong"},
+        {"op": "login", "username": "ana", "password": "pw"},
+        {"op": "delete", "id": 1},
+    ])
+    assert kim[3]["transaction"]["amount"] == 25.0
+    assert kim[4] == {"ok": False, "error": "Amount must be a positive number."}
+    assert kim[7]["budgets"]["trip"]["progress"] == 100.0
+    assert kim[8] == {"ok": True, "id": 1}
+    assert kim[9]["transactions"] == []
+    assert ana[1] == {"ok": False, "error": "Incorrect password."}
+    assert ana[3] == {"ok": False, "error": "Transaction not found."}
+    assert "trip" in (ledger / "budgets.csv").read_text()
+
+
+def test_bad_requests_get_errors_and_keep_the_connection(ledger, monkeypatch):
+    monkeypatch.setattr(pennywise, "logged_in_users", {})
+    # User store I/O runs on the writer thread, not on the event loop
+    lookup_threads = []
+    find_user = pennywise.find_user
+    monkeypatch.setattr(pennywise, "find_user", lambda username: (
+        lookup_threads.append(threading.current_thread()), find_user(username))[1])
+    good = {"op": "add", "type": "expense", "amount": 20, "category": "Food", "date": "2024-12-01"}
+    bad = [
+        {"op": "register", "username": ["kim"], "password": "pw"},
+        {"op": "view", "limit": [1]},
+        {"op": "view", "before": 5},
+        {"op": "view", "before": ["2024-12-01", "1"]},
+        {"op": "delete", "id": [1]},
+        {"op": "update", "id": "1", "field": "amount", "value": 5},
+        {"op": "update", "id": 1, "field": "category", "value": {"name": "Food"}},
+        {**good, "username": 5},
+        {**good, "amount": "1e400"},
+        {"op": "add_budget", "goal": "trip", "amount": "1e400"},
+    ]
+    [responses] = run_service(ledger, [
+        {"op": "register", "username": "kim", "password": "pw"},
+        {"op": "login", "username": "kim", "password": "pw"},
+        good,
+        *bad,
+        {"op": "view"},
+    ])
+    assert all(r["ok"] for r in responses[:3])
+    assert all(not r["ok"] and r["error"] for r in responses[3:-1])
+    assert [t["amount"] for t in responses[-1]["transactions"]] == [20.0]
+    assert lookup_threads and threading.main_thread() not in lookup_threads
+
+
+def test_ids_handed_out_survive_compaction(ledger, monkeypatch):
+    monkeypatch.setattr(pennywise, "logged_in_users", {})
+    monkeypatch.setattr(pennywise, "journal_compact_threshold", 3)
+    add = {"op": "add", "type": "expense", "category": "Food"}
+    [responses] = run_service(ledger, [
+        {"op": "register", "username": "kim", "password": "pw"},
+        {"op": "login", "username": "kim", "password": "pw"},
+        {**add, "amount": 1, "date": "2024-12-01"},
+        {**add, "amount": 2, "date": "2024-12-02"},
+        {**add, "amount": 3, "date": "2024-12-03"},  # Compacts
+        {"op": "delete", "id": 1},
+        {"op": "update", "id": 3, "field": "amount", "value": 30},
+        {**add, "amount": 4, "date": "2024-12-04"},  # Compacts again
+        {"op": "view", "before": ["2024-12-04", 4]},
+        {"op": "delete", "id": 2},
+        {"op": "view"},
+    ])
+    assert all(r["ok"] for r in responses)
+    assert [r["transaction"]["id"] for r in responses[2:5]] == [1, 2, 3]
+    assert responses[6]["transaction"] == {**responses[4]["transaction"], "amount": 30.0}
+    assert responses[7]["transaction"]["id"] == 4
+    assert [(t["id"], t["amount"]) for t in responses[8]["transactions"]] == [(3, 30.0), (2, 2.0)]
+    assert responses[9] == {"ok": True, "id": 2}
+    assert [(t["id"], t["amount"]) for t in responses[10]["transactions"]] == [(4, 4.0), (3, 30.0)]
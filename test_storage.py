@@ -0,0 +1,76 @@
+import datetime
+
+import pennywise
+from storage import SQLiteStorage, migrate_from_csv
+
+
+def test_sqlite_backend_round_trip(ledger, monkeypatch):
+    backend = SQLiteStorage(str(ledger / "pennywise.db"))
+    pennywise.use_storage(backend)
+    date = datetime.date(2024, 12, 9)
+    income = pennywise.create_transaction("kim", "income", 1000.0, "Income", date)
+    food = pennywise.create_transaction("kim", "expense", 50.0, "Food", date)
+    pennywise.create_transaction("lala", "income", 20.0, "Income", date)
+    pennywise.modify_transaction(food, "amount", 75.0)
+    pennywise.remove_transaction(income)
+
+    mode = backend.connection.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+    plan = backend.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM transactions WHERE username = ? ORDER BY date", ("kim",)
+    ).fetchall()
+    assert "transactions_user_date" in str(plan)
+
+    monkeypatch.setattr(pennywise, "user_transactions_index", {})
+    monkeypatch.setattr(pennywise, "user_totals", {})
+    pennywise.load_transactions()
+    assert pennywise.user_transactions_index == {}
+    kim = pennywise.get_user_transactions("kim")
+    assert [(t["id"], t["amount"]) for t in kim] == [(food["id"], 75.0)]
+    assert "lala" not in pennywise.user_transactions_index
+    assert pennywise.next_transaction_id == 4
+
+
+def test_migrate_from_csv(tmp_path):
+    (tmp_path / "users.csv").write_text("username,password\nkim,urge\n")
+    (tmp_path / "transactions.csv").write_text(
+        "username,type,amount,category,date\nkim,income,1000.0,Income,2024-12-09\n"
+        "kim,expense,200.0,Food,2024-12-10\n"
+    )
+    (tmp_path / "budgets.csv").write_text(
+        "goal,progress,start_date,end_date,username\nipad,0,2024-12-03,2025-07-13,kim\n"
+        "ipad,0,2024-12-15,2025-06-01,kim\n"
+        "ipad,12"  # Torn by an interrupted append
+    )
+    db_path = str(tmp_path / "pennywise.db")
+    counts = migrate_from_csv(db_path, str(tmp_path / "users.csv"), str(tmp_path / "transactions.csv"),
+                              str(tmp_path / "budgets.csv"), str(tmp_path / "transactions.journal"))
+    assert counts == {"users": 1, "transactions": 2, "budgets": 2}
+
+    backend = SQLiteStorage(db_path)
+    assert backend.get_user("kim") == "urge"
+    assert backend.get_user("nobody") is None
+    assert [t["amount"] for t in backend.load_user_transactions("kim")] == [1000.0, 200.0]
+    assert [b["end_date"] for b in backend.load_budgets()] == [datetime.date(2025, 6, 1)]
+    backend.close()
+
+
+def test_migrate_includes_the_journal(ledger):
+    date = datetime.date(2024, 12, 9)
+    for amount in (10.0, 20.0, 30.0):
+        pennywise.create_transaction("kim", "expense", amount, "Food", date)
+    pennywise.remove_transaction(pennywise.transactions_by_id[1])
+    pennywise.compact_transactions()  # The snapshot now starts at id 2
+    pennywise.modify_transaction(pennywise.transactions_by_id[2], "amount", 25.0)
+    pennywise.create_transaction("kim", "income", 40.0, "Income", date)
+
+    db_path = str(ledger / "pennywise.db")
+    counts = migrate_from_csv(db_path, str(ledger / "users.csv"), str(ledger / "transactions.csv"),
+                              str(ledger / "budgets.csv"), str(ledger / "transactions.journal"))
+    assert counts["transactions"] == 3
+    backend = SQLiteStorage(db_path)
+    assert [(t["id"], t["amount"]) for t in backend.load_user_transactions("kim")] == [
+        (2, 25.0), (3, 30.0), (4, 40.0)
+    ]
+    assert backend.next_transaction_id() == pennywise.next_transaction_id
+    backend.close()
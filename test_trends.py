@@ -0,0 +1,66 @@
+import datetime
+import statistics
+
+import pytest
+
+import expensetrends
+from trends import ExpenseSeries, SpendStats, rollup
+
+
+def make_series(rows):
+    series = ExpenseSeries()
+    for amount, date in rows:
+        series.add(amount, datetime.date.fromisoformat(date))
+    return series
+
+
+def test_rollups(backend):
+    food = make_series([(10.0, "2024-11-29"), (5.0, "2024-12-01"), (2.5, "2024-12-02"), (1.0, "2024-12-31")])
+    rent = make_series([(100.0, "2024-12-02")])
+
+    assert rollup([food], "daily")[:2] == [(datetime.date(2024, 11, 29), 10.0), (datetime.date(2024, 12, 1), 5.0)]
+    # 2024-11-29 is a Friday and 2024-12-01 a Sunday, both in the week of Monday 2024-11-25
+    assert rollup([food, rent], "weekly") == [
+        (datetime.date(2024, 11, 25), 15.0),
+        (datetime.date(2024, 12, 2), 102.5),
+        (datetime.date(2024, 12, 30), 1.0),
+    ]
+    assert rollup([food, rent], "monthly", start=datetime.date(2024, 12, 1), end=datetime.date(2024, 12, 30)) == [
+        (datetime.date(2024, 12, 1), 107.5),
+    ]
+    assert rollup([ExpenseSeries()], "monthly") == []
+    with pytest.raises(ValueError):
+        rollup([food], "hourly")
+
+
+def test_all_categories_view(monkeypatch, capsys):
+    monkeypatch.setattr(expensetrends, "expense_trends", {})
+    monkeypatch.setattr(expensetrends, "expense_stats", {})
+    expensetrends.add_expense("Food", 20.5, "2024-11-29")
+    expensetrends.add_expense("Transport", 3.0, "2024-11-30")
+    expensetrends.add_expense("Food", 1.0, "29/11/2024")
+    assert len(expensetrends.expense_trends["Food"]) == 1
+
+    expensetrends.view_expense_trends()
+    out = capsys.readouterr().out
+    assert "Category: Transport" in out
+    assert "2024-11: 23.50" in out
+
+
+def test_spend_stats_stream(monkeypatch, capsys):
+    stats = SpendStats(window=3, alpha=0.5, threshold=3.0, min_count=5)
+    amounts = [10.0, 12.0, 11.0, 9.0, 10.0, 11.0]
+    assert not any(stats.add(amount) for amount in amounts)
+    assert stats.mean == pytest.approx(statistics.mean(amounts))
+    assert stats.variance == pytest.approx(statistics.variance(amounts))
+    assert stats.window_average == pytest.approx(10.0)
+    assert len(stats.recent) == 3
+    assert stats.add(100.0)
+    assert stats.last_z > 3.0
+
+    monkeypatch.setattr(expensetrends, "expense_trends", {})
+    monkeypatch.setattr(expensetrends, "expense_stats", {})
+    for day, amount in enumerate([20.0, 22.0, 21.0, 19.0, 20.0, 21.0, 20.0, 22.0, 19.0, 21.0, 500.0], start=1):
+        expensetrends.add_expense("Food", amount, f"2024-11-{day:02d}")
+    assert "Unusual spend: 500.0" in capsys.readouterr().out
+    assert expensetrends.unusual_categories() == ["Food"]
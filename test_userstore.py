@@ -0,0 +1,60 @@
+import pytest
+
+import pennywise
+from userstore import UserStore
+
+
+def test_user_store_appends_and_looks_up_single_users(tmp_path):
+    csv_path = tmp_path / "users.csv"
+    csv_path.write_text("username,password\nkim,urge\nerich,nicole\n")
+    store = UserStore(str(csv_path), str(tmp_path / "users.idx"))
+    assert store.get("erich") == "nicole"
+    assert store.get("nobody") is None
+
+    store.add("lala", "secret")
+    assert csv_path.read_text().splitlines()[-1] == "lala,secret"
+    assert store.get("lala") == "secret"
+
+    # Rows appended by someone else are picked up, a rewrite rebuilds the index
+    with open(csv_path, "a") as f:
+        f.write("eme,pw\n")
+    assert store.get("eme") == "pw"
+    csv_path.write_text("username,password\nkim,new\n")
+    assert store.get("kim") == "new"
+    assert store.get("lala") is None
+    store.close()
+
+
+def test_register_and_login_use_the_user_store(ledger, monkeypatch):
+    answers = iter(["kim", "urge", "kim", "urge"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    pennywise.register()
+    monkeypatch.setattr(pennywise, "users", {})
+    assert pennywise.login() == "kim"
+    assert (ledger / "users.csv").read_text().splitlines() == ["username,password", "kim,urge"]
+
+
+def test_user_store_guards_the_line_index(tmp_path):
+    csv_path = tmp_path / "users.csv"
+    csv_path.write_text("username,password\nkim,urge")  # Hand-edited, no final line break
+    store = UserStore(str(csv_path), str(tmp_path / "users.idx"))
+    store.add("lala", "secret")
+    assert csv_path.read_text().splitlines() == ["username,password", "kim,urge", "lala,secret"]
+    assert store.get("kim") == "urge"
+    assert store.get("lala") == "secret"
+
+    for username, password in [("a,b", "pw"), ("a\nb", "pw"), ("eme", "p\nw")]:
+        with pytest.raises(ValueError):
+            store.add(username, password)
+    store.add("erich", "comma,ok")
+    assert store.get("erich") == "comma,ok"
+    assert store.get("a") is None
+    store.close()
+
+
+def test_register_refuses_names_the_store_cannot_hold(ledger, monkeypatch, capsys):
+    answers = iter(["kim,lee", "urge"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    pennywise.register()
+    assert "cannot contain commas" in capsys.readouterr().out
+    assert pennywise.find_user("kim,lee") is None
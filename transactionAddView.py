@@ -1,11 +1,156 @@
 import csv
-from datetime import datetime, timedelta
+import heapq
+import itertools
+import os
+import threading
+from datetime import datetime
+
+from export import export_rows
+from money import format_amount, parse_amount
+from records import Transaction
+from recurrence import count_until, nth_occurrence
+
+
+RULE_FIELDS = ["id", "type", "category", "amount", "interval", "start_date", "occurrences", "next_due"]
+PROCESSED_FIELDS = ["rule", "occurrence", "date", "type", "category", "amount"]
 
 
 class RecurringTransactionManager:
-    def __init__(self):
-        self.recurring_transactions = []  # List to store recurring transaction data
+    def __init__(self, rules_file=None, processed_file=None):
+        """Keep recurring rules and the transactions they generate.
+
+        With a rules_file the rules and their progress are saved there, and
+        the generated transactions are appended to processed_file (next to
+        the rules by default) before the progress is saved, so a restart
+        neither loses nor repeats an occurrence.
+        """
         self.transactions = []  # List to store processed transactions
+        self.rules_file = rules_file  # Where rules are saved between runs, if anywhere
+        if rules_file and processed_file is None:
+            processed_file = os.path.splitext(rules_file)[0] + "_processed.csv"
+        self.processed_file = processed_file
+        self.recurring_transactions = []  # List to store recurring transaction data
+        if rules_file:
+            self.load_rules()
+            self.load_processed()
+
+    @property
+    def recurring_transactions(self):
+        return self._recurring_transactions
+
+    @recurring_transactions.setter
+    def recurring_transactions(self, rules):
+        self._recurring_transactions = rules
+        self.schedule = []  # Min-heap of (next_due, sequence, rule)
+        self.scheduled = []  # Identities of the rules in the heap, in list order
+        self.sequence = itertools.count()
+        self.rule_ids = itertools.count(max((rule["id"] for rule in rules if "id" in rule), default=0) + 1)
+
+    def schedule_rule(self, rule):
+        if "id" not in rule:
+            rule["id"] = next(self.rule_ids)
+        heapq.heappush(self.schedule, (rule["next_due"], next(self.sequence), rule))
+
+    def sync_schedule(self):
+        """Bring the heap in line with recurring_transactions.
+
+        Appended rules are pushed; if rules were removed or reordered, the
+        heap is rebuilt so no entry points at a rule that is gone.
+        """
+        rules = self.recurring_transactions
+        identities = list(map(id, rules))
+        if identities == self.scheduled:
+            return
+        if identities[:len(self.scheduled)] != self.scheduled:
+            self.schedule = []
+            self.scheduled = []
+        for rule in rules[len(self.scheduled):]:
+            self.schedule_rule(rule)
+        self.scheduled = identities
+
+    def next_due(self):
+        """Return the earliest next due date of all rules, or None if there are none."""
+        self.sync_schedule()
+        return self.schedule[0][0] if self.schedule else None
+
+    def load_rules(self):
+        """Load the saved rules and how far each has been processed."""
+        try:
+            with open(self.rules_file, mode='r', newline='') as file:
+                self.recurring_transactions = [
+                    {
+                        **({"id": int(row["id"])} if row.get("id") else {}),
+                        "type": row["type"],
+                        "category": row["category"],
+                        "amount": float(row["amount"]),
+                        "interval": row["interval"],
+                        "start_date": datetime.strptime(row["start_date"], "%Y-%m-%d").date(),
+                        "occurrences": int(row["occurrences"]),
+                        "next_due": datetime.strptime(row["next_due"], "%Y-%m-%d").date(),
+                    }
+                    for row in csv.DictReader(file)
+                ]
+        except FileNotFoundError:
+            self.recurring_transactions = []
+
+    def save_rules(self):
+        """Save every rule, replacing the rules file in one step."""
+        if not self.rules_file:
+            return
+        temporary_file = self.rules_file + ".tmp"
+        with open(temporary_file, mode='w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=RULE_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for rule in self.recurring_transactions:
+                # Rules without a start date count from next_due
+                writer.writerow({"start_date": rule["next_due"], "occurrences": 0, **rule})
+        os.replace(temporary_file, self.rules_file)
+
+    def load_processed(self):
+        """Load the generated transactions and catch rules up with any saved after their progress."""
+        if not self.processed_file:
+            return
+        done = {}  # rule id -> occurrences saved
+        try:
+            with open(self.processed_file, mode='rb+') as file:
+                lines = []
+                offset = 0
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        # The last append was interrupted; its rule progress was never saved either
+                        file.truncate(offset)
+                        break
+                    offset += len(line)
+                    lines.append(line.decode())
+        except FileNotFoundError:
+            return
+        for row in csv.DictReader(lines):
+            self.transactions.append(Transaction(
+                type=row["type"], amount=float(row["amount"]), category=row["category"],
+                date=datetime.strptime(row["date"], "%Y-%m-%d").date(),
+            ))
+            rule_id = int(row["rule"])
+            done[rule_id] = max(done.get(rule_id, 0), int(row["occurrence"]) + 1)
+        for rule in self.recurring_transactions:
+            if done.get(rule.get("id"), 0) > rule["occurrences"]:
+                rule["occurrences"] = done[rule["id"]]
+                rule["next_due"] = nth_occurrence(rule["start_date"], rule["interval"], rule["occurrences"])
+
+    def save_processed(self, processed):
+        """Append (rule id, occurrence, transaction) rows and sync them before the rules are saved."""
+        if not self.processed_file:
+            return
+        new_file = not os.path.exists(self.processed_file)
+        with open(self.processed_file, mode='a', newline='') as file:
+            writer = csv.writer(file)
+            if new_file:
+                writer.writerow(PROCESSED_FIELDS)
+            writer.writerows(
+                [rule_id, occurrence, t["date"], t["type"], t["category"], format_amount(t["amount"])]
+                for rule_id, occurrence, t in processed
+            )
+            file.flush()
+            os.fsync(file.fileno())
 
     def add_recurring_transaction(self):
         """Add a recurring transaction."""
@@ -16,7 +161,7 @@ class RecurringTransactionManager:
                 return
 
             category = input("Enter category (e.g., Rent, Subscription): ").strip()
-            amount = float(input(f"Enter amount for {category}: "))
+            amount = parse_amount(input(f"Enter amount for {category}: "))
             if amount <= 0:
                 print("Amount must be greater than zero.")
                 return
@@ -34,39 +179,40 @@ class RecurringTransactionManager:
                 return
 
             self.recurring_transactions.append({
+                "id": next(self.rule_ids),
                 "type": trans_type,
                 "category": category,
                 "amount": amount,
                 "interval": interval,
-                "next_due": next_due
+                "next_due": next_due,
+                "start_date": next_due,
+                "occurrences": 0  # Occurrences processed so far
             })
+            self.save_rules()
             print(f"Recurring transaction for '{category}' added successfully.")
         except ValueError:
             print("Invalid input. Please enter valid numbers for the amount.")
 
-    def process_recurring_transactions(self):
+    def run_due(self, today):
+        """Process only the rules due on or before today and return the new transactions."""
+        self.sync_schedule()
+        processed = []
+        while self.schedule and self.schedule[0][0] <= today:
+            _, _, rule = heapq.heappop(self.schedule)
+            for transaction in self.due_transactions(rule, today):
+                processed.append((rule["id"], rule["occurrences"] - 1, transaction))
+            self.schedule_rule(rule)
+        processed_transactions = [transaction for _, _, transaction in processed]
+        if processed:
+            # Transactions first: after a crash in between, load_processed() catches the rules up
+            self.save_processed(processed)
+            self.transactions.extend(processed_transactions)
+            self.save_rules()
+        return processed_transactions
+
+    def process_recurring_transactions(self, today=None):
         """Process recurring transactions that are due."""
-        current_date = datetime.now().date()
-        processed_transactions = []
-
-        for transaction in self.recurring_transactions:
-            while transaction["next_due"] <= current_date:
-                # Add to processed transactions
-                self.transactions.append({
-                    "type": transaction["type"],
-                    "category": transaction["category"],
-                    "amount": transaction["amount"],
-                    "date": transaction["next_due"]
-                })
-                processed_transactions.append({
-                    "type": transaction["type"],
-                    "category": transaction["category"],
-                    "amount": transaction["amount"],
-                    "date": transaction["next_due"]
-                })
-
-                # Update next due date
-                transaction["next_due"] = self.calculate_next_due_date(transaction["next_due"], transaction["interval"])
+        processed_transactions = self.run_due(today or datetime.now().date())
 
         if processed_transactions:
             print("\nProcessed Transactions:")
@@ -75,19 +221,50 @@ class RecurringTransactionManager:
         else:
             print("No recurring transactions to process today.")
 
+    @staticmethod
+    def due_transactions(transaction, until):
+        """Yield the occurrences of a rule that are due on or before until, oldest first.
+
+        The dates are computed directly from the rule's start date, so catching
+        up on years of a daily rule costs one step per occurrence returned.
+        The rule moves past each occurrence as it is yielded; stopping early
+        leaves the rest due for the next run.
+        """
+        if "start_date" not in transaction:
+            # Older rules only have next_due, so count from there
+            transaction["start_date"] = transaction["next_due"]
+            transaction["occurrences"] = 0
+        start = transaction["start_date"]
+        interval = transaction["interval"]
+        try:
+            for n in range(transaction["occurrences"], count_until(start, interval, until)):
+                transaction["occurrences"] = n + 1
+                yield Transaction(type=transaction["type"], amount=transaction["amount"],
+                                  category=transaction["category"], date=nth_occurrence(start, interval, n))
+        finally:
+            transaction["next_due"] = nth_occurrence(start, interval, transaction["occurrences"])
+
     @staticmethod
     def calculate_next_due_date(current_date, interval):
         """Calculate the next due date based on the interval."""
-        if interval == "daily":
-            return current_date + timedelta(days=1)
-        elif interval == "weekly":
-            return current_date + timedelta(weeks=1)
-        elif interval == "monthly":
-            next_month = current_date.month % 12 + 1
-            year_increment = (current_date.month + 1) // 13
-            return current_date.replace(month=next_month, year=current_date.year + year_increment)
-        elif interval == "yearly":
-            return current_date.replace(year=current_date.year + 1)
+        return nth_occurrence(current_date, interval, 1)
+
+    def run_scheduler(self, stop=None, max_sleep=3600):
+        """Keep processing rules as they fall due until stop (a threading.Event) is set.
+
+        Between runs it sleeps until the next due date starts, waking at least
+        every max_sleep seconds to pick up rules added in the meantime.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            for trans in self.run_due(datetime.now().date()):
+                print(f"{trans['date']}: {trans['type']} - {trans['category']} (${trans['amount']})")
+            next_due = self.next_due()
+            seconds = max_sleep
+            if next_due is not None:
+                wake = datetime.combine(next_due, datetime.min.time())
+                seconds = min(max_sleep, max(0.0, (wake - datetime.now()).total_seconds()))
+            stop.wait(seconds)
 
     def view_recurring_transactions(self):
         """View all recurring transactions."""
@@ -108,21 +285,21 @@ class RecurringTransactionManager:
         for trans in self.transactions:
             print(f"{trans['date']}: {trans['type'].capitalize()} - {trans['category']} (${trans['amount']})")
 
-    def export_transactions(self, filename="transactions.csv"):
-        """Export all transactions to a CSV file."""
+    def export_transactions(self, filename="recurring_transactions.csv", transactions=None, **filters):
+        """Export transactions to a CSV or JSON Lines file, gzipped if the name ends in .gz.
+
+        Exports the processed transactions unless another iterable is given.
+        filters are passed on to export.export_rows (start, end, username, ...).
+        """
         try:
-            with open(filename, mode='w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(["Date", "Type", "Category", "Amount"])
-                for trans in self.transactions:
-                    writer.writerow([trans["date"], trans["type"], trans["category"], trans["amount"]])
-            print(f"Transactions exported successfully to '{filename}'.")
+            count = export_rows(self.transactions if transactions is None else transactions, filename, **filters)
+            print(f"{count} transactions exported successfully to '{filename}'.")
         except Exception as e:
             print(f"Error exporting transactions: {e}")
 
 
 def main():
-    manager = RecurringTransactionManager()
+    manager = RecurringTransactionManager("recurring_rules.csv", "recurring_processed.csv")
 
     while True:
         print("\n--- Recurring Transaction Manager ---")
@@ -131,9 +308,10 @@ def main():
         print("3. View Recurring Transactions")
         print("4. View Processed Transactions")
         print("5. Export Processed Transactions")
-        print("6. Exit")
+        print("6. Run Scheduler")
+        print("7. Exit")
 
-        choice = input("Choose an option (1-6): ").strip()
+        choice = input("Choose an option (1-7): ").strip()
         if choice == "1":
             manager.add_recurring_transaction()
         elif choice == "2":
@@ -143,12 +321,19 @@ def main():
         elif choice == "4":
             manager.view_processed_transactions()
         elif choice == "5":
-            manager.export_transactions()
+            filename = input("Enter file name (.csv, .jsonl, optionally .gz) or press Enter for recurring_transactions.csv: ").strip()
+            manager.export_transactions(filename or "recurring_transactions.csv")
         elif choice == "6":
+            print("Scheduler running. Press Ctrl+C to stop.")
+            try:
+                manager.run_scheduler()
+            except KeyboardInterrupt:
+                print("\nScheduler stopped.")
+        elif choice == "7":
             print("Exiting Recurring Transaction Manager. Goodbye!")
             break
         else:
-            print("Invalid choice. Please enter a number between 1 and 6.")
+            print("Invalid choice. Please enter a number between 1 and 7.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+import array
+import collections
+import datetime
+import math
+
+import money
+from money import from_cents, sum_cents_by_code, to_cents
+
+PERIODS = ["daily", "weekly", "monthly"]
+
+
+def period_start(key, period):
+    """Return the first day of the period identified by key."""
+    if period == "daily":
+        return datetime.date.fromordinal(key)
+    if period == "weekly":
+        # Ordinal 1 (0001-01-01) is a Monday, so weeks run Monday to Sunday
+        return datetime.date.fromordinal(key * 7 + 1)
+    return datetime.date(key // 12, key % 12 + 1, 1)
+
+
+class ExpenseSeries:
+    def __init__(self):
+        """Keep the expenses of one category as compact columns.
+
+        Dates are parsed once on add and stored as day ordinals together with
+        a month number (year * 12 + month - 1), so rollups never touch strings.
+        Amounts are stored as integer cents and totalled exactly.
+        """
+        self.days = array.array("q")
+        self.months = array.array("q")
+        self.cents = array.array("q")
+
+    def __len__(self):
+        return len(self.cents)
+
+    def add(self, amount, date):
+        self.days.append(date.toordinal())
+        self.months.append(date.year * 12 + date.month - 1)
+        self.cents.append(to_cents(amount))
+
+
+class SpendStats:
+    def __init__(self, window=30, alpha=0.1, threshold=3.0, min_count=10):
+        """Streaming statistics of one category's expenses in constant memory.
+
+        Keeps an exponential moving average (weight alpha), the average of the
+        last window expenses, and the running mean and variance (Welford).
+        An expense more than threshold standard deviations from the mean of
+        the earlier ones is unusual, once min_count expenses have been seen.
+        """
+        self.alpha = alpha
+        self.threshold = threshold
+        self.min_count = min_count
+        self.recent = collections.deque(maxlen=window)
+        self.recent_total = 0.0
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared differences from the mean
+        self.ema = None
+        self.last_z = None
+        self.last_unusual = False
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def window_average(self):
+        return self.recent_total / len(self.recent) if self.recent else 0.0
+
+    def z_score(self, amount):
+        """Return how many standard deviations amount is from the mean, or None."""
+        std = self.std
+        return (amount - self.mean) / std if std > 0 else None
+
+    def add(self, amount):
+        """Update every statistic with one expense and return True if it is unusual."""
+        self.last_z = self.z_score(amount)
+        self.last_unusual = (self.count >= self.min_count and self.last_z is not None
+                             and abs(self.last_z) >= self.threshold)
+
+        self.count += 1
+        delta = amount - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (amount - self.mean)
+
+        self.ema = amount if self.ema is None else self.ema + self.alpha * (amount - self.ema)
+
+        if len(self.recent) == self.recent.maxlen:
+            self.recent_total -= self.recent[0]
+        self.recent.append(amount)
+        self.recent_total += amount
+        return self.last_unusual
+
+
+def rollup(series, period="monthly", start=None, end=None):
+    """Total the expenses of one or more ExpenseSeries per day, week or month.
+
+    Returns [(first day of the period, total)] oldest first, optionally only
+    for expenses dated from start to end (both inclusive).
+    """
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period '{period}'.")
+    low = start.toordinal() if start is not None else None
+    high = end.toordinal() if end is not None else None
+    if money.numpy is not None:
+        return numpy_rollup(series, period, low, high)
+
+    totals = {}
+    for s in series:
+        for day, month, cents in zip(s.days, s.months, s.cents):
+            if (low is not None and day < low) or (high is not None and day > high):
+                continue
+            if period == "daily":
+                key = day
+            elif period == "weekly":
+                key = (day - 1) // 7
+            else:
+                key = month
+            totals[key] = totals.get(key, 0) + cents
+    return [(period_start(key, period), from_cents(totals[key])) for key in sorted(totals)]
+
+
+def numpy_rollup(series, period, low, high):
+    numpy = money.numpy
+    series = [s for s in series if len(s)]
+    if not series:
+        return []
+    # frombuffer reads the arrays in place, only the concatenation copies
+    days = numpy.concatenate([numpy.frombuffer(s.days, dtype=numpy.int64) for s in series])
+    cents = numpy.concatenate([numpy.frombuffer(s.cents, dtype=numpy.int64) for s in series])
+    if period == "daily":
+        keys = days
+    elif period == "weekly":
+        keys = (days - 1) // 7
+    else:
+        keys = numpy.concatenate([numpy.frombuffer(s.months, dtype=numpy.int64) for s in series])
+    if low is not None or high is not None:
+        mask = numpy.ones(len(days), dtype=bool)
+        if low is not None:
+            mask &= days >= low
+        if high is not None:
+            mask &= days <= high
+        keys = keys[mask]
+        cents = cents[mask]
+    if not len(keys):
+        return []
+    # Periods span a small range of keys, so count straight into one slot per key
+    first = keys.min()
+    offsets = keys - first
+    totals = sum_cents_by_code(offsets, cents, int(offsets.max()) + 1)
+    present = numpy.flatnonzero(numpy.bincount(offsets))
+    return [(period_start(int(first + offset), period), from_cents(totals[offset])) for offset in present]
@@ -0,0 +1,107 @@
+import csv
+import io
+import os
+import sqlite3
+
+
+class UserStore:
+    def __init__(self, csv_path, index_path):
+        """Open the users in csv_path together with their index at index_path.
+
+        The index maps each username to the byte offset of its row, so
+        registering appends one row and a login reads one row. users.csv stays
+        the source of truth; the index catches up when the file changes.
+        """
+        self.csv_path = csv_path
+        self.index_path = index_path
+        # The service runs lookups on its writer thread; callers never share the store concurrently
+        self.index = sqlite3.connect(index_path, check_same_thread=False)
+        self.index.execute("CREATE TABLE IF NOT EXISTS offsets (username TEXT PRIMARY KEY, offset INTEGER NOT NULL)")
+        self.index.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self.refresh_index()
+
+    def close(self):
+        self.index.close()
+
+    def indexed_size(self):
+        row = self.index.execute("SELECT value FROM meta WHERE key = 'size'").fetchone()
+        return row[0] if row else 0
+
+    def refresh_index(self):
+        """Index any rows added to users.csv since the index was last updated."""
+        try:
+            size = os.path.getsize(self.csv_path)
+        except FileNotFoundError:
+            size = 0
+        indexed = self.indexed_size()
+        if size == indexed:
+            return
+        if size < indexed:
+            # The file was rewritten, so the old offsets mean nothing
+            indexed = 0
+        with self.index:
+            if indexed == 0:
+                self.index.execute("DELETE FROM offsets")
+            with open(self.csv_path, "rb") as f:
+                f.seek(indexed)
+                offset = indexed
+                for line in f:
+                    # Skip the header row
+                    if offset > 0 or not line.startswith(b"username,"):
+                        row = next(csv.reader([line.decode()]), None)
+                        if row:
+                            self.index.execute("INSERT OR REPLACE INTO offsets VALUES (?, ?)", (row[0], offset))
+                    offset += len(line)
+            self.index.execute("INSERT OR REPLACE INTO meta VALUES ('size', ?)", (size,))
+
+    def read_row(self, username):
+        """Return the CSV fields stored at the indexed offset of username, or None."""
+        row = self.index.execute("SELECT offset FROM offsets WHERE username = ?", (username,)).fetchone()
+        if row is None:
+            return None
+        with open(self.csv_path, "rb") as f:
+            f.seek(row[0])
+            return next(csv.reader([f.readline().decode()]), [])
+
+    def get(self, username):
+        """Return the password of one user, or None if the user does not exist."""
+        self.refresh_index()
+        fields = self.read_row(username)
+        if fields is not None and fields[:1] != [username]:
+            # users.csv was rewritten in place; start the index over
+            with self.index:
+                self.index.execute("DELETE FROM meta")
+            self.refresh_index()
+            fields = self.read_row(username)
+        if not fields or fields[0] != username:
+            return None
+        return fields[1]
+
+    def __contains__(self, username):
+        return self.get(username) is not None
+
+    def add(self, username, password):
+        """Append a new user to users.csv and index it.
+
+        The index keeps one line per user, so line breaks are refused in
+        both fields and commas in the username.
+        """
+        if any(c in username for c in ",\r\n") or any(c in password for c in "\r\n"):
+            raise ValueError("Usernames cannot contain commas or line breaks, passwords cannot contain line breaks.")
+        self.refresh_index()
+        line = io.StringIO()
+        csv.writer(line).writerow([username, password])
+        with open(self.csv_path, "ab+") as f:
+            if f.tell() == 0:
+                f.write(b"username,password\r\n")
+            else:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    # A hand edit left the last row without its line break
+                    f.write(b"\r\n")
+            offset = f.tell()
+            f.write(line.getvalue().encode())
+            size = f.tell()
+        with self.index:
+            self.index.execute("INSERT OR REPLACE INTO offsets VALUES (?, ?)", (username, offset))
+            self.index.execute("INSERT OR REPLACE INTO meta VALUES ('size', ?)", (size,))